@@ -17,6 +17,9 @@ setup(
     install_requires=[
         'requests >= 1.2.3',
     ],
+    extras_require={
+        'http2': ['httpx[http2]'],
+    },
     classifiers=[
         'Development Status :: 5 - Production/Stable',
         'Environment :: Console',
@@ -36,10 +36,37 @@ from .exceptions import (
     BadUri,
     ErrorResponse,
     CannotConnectToAddress,
+    CircuitOpen,
+    NPlusOneQueries,
+    NPlusOneWarning,
+    RequestTimeout,
+    DeadlineExceeded,
     IncorrectNestedResourceArgs,
     IncorrectNestedResourceKwargs,
     MissingCsrfTokenInCookies,
     OrderByRequiredForReverse,
 )
 
+from .breaker import CircuitBreaker
+
+from .cache import MemoryCache, DiskCache
+
+from .deadline import deadline
+
+from .events import Hooks
+
 from .factory import ResourceFactory
+
+from .gather import gather
+
+from .nplusone import NPlusOneDetector
+
+from .paging import AdaptivePageSize
+
+from .retry import RetryPolicy
+
+from .stats import QueryStats
+
+from .throttle import Throttle
+
+from .transport import Transport, RequestsTransport, WsgiTransport, Http2Transport
@@ -12,12 +12,24 @@
 __all__ = ('TastyApi', )
 
 
+import copy
 import json
+import threading
+import time
+import zlib
 import requests
+try:
+    from urllib.parse import urlparse
+except ImportError:     # For python < 3
+    from urlparse import urlparse
 
+from .deadline import remaining_time
+from .events import RequestEvent, url_template
 from .exceptions import (
     ErrorResponse,
     CannotConnectToAddress,
+    RequestTimeout,
+    DeadlineExceeded,
     ResourceDeleted,
     IncorrectNestedResourceKwargs,
     BadUri,
@@ -25,6 +37,58 @@ from .exceptions import (
 )
 from .lock import PickleLock
 from .schema import TastySchema
+from .transport import RequestsTransport
+from . import stats
+
+
+# Only ask for the encodings that requests (ie. urllib3) can decode, which
+# includes brotli when it's installed.
+_ACCEPT_ENCODING = requests.utils.default_headers()['Accept-Encoding']
+
+
+def _gzip(data):
+    # zlib rather than gzip.compress, which python 2 doesn't have.
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+def _normalise_param(value):
+    if isinstance(value, (list, tuple)):
+        return tuple(_normalise_param(v) for v in value)
+    return str(value)
+
+
+class _NotThrottled(object):
+    """A context manager that does nothing, for when there's no Throttle."""
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *args):
+        pass
+
+
+_NOT_THROTTLED = _NotThrottled()
+
+
+def _own_copy(error):
+    """Return a copy of the exception for another thread to raise, so that
+    threads don't add to each other's tracebacks."""
+    try:
+        own_error = copy.copy(error)
+    except Exception:       # Not every exception can be recreated from its args.
+        return error
+    own_error.__cause__ = error
+    return own_error
+
+
+class _Flight(object):
+    """A GET request in progress, which identical GETs can wait for."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.response = None
+        self.error = None
 
 
 class TastyApi(object):
@@ -32,67 +96,339 @@ class TastyApi(object):
 
     :param address: URL of the TastyPie API.
     :type address: str
+    :param page_size: The policy deciding how many resources to request per
+        page, or None to let the server decide.
+    :type page_size: :py:class:`~tastytopping.paging.AdaptivePageSize`
+    :param cache: The cache to keep responses to GET requests in, or None to
+        not cache responses.
+    :type cache: :py:class:`~tastytopping.cache.BaseCache`
+    :param retry: The policy deciding which failed requests to retry, or None
+        to never retry requests.
+    :type retry: :py:class:`~tastytopping.retry.RetryPolicy`
+    :param throttle: The limits on the rate and concurrency of requests, or
+        None to send requests as soon as they're made.
+    :type throttle: :py:class:`~tastytopping.throttle.Throttle`
+    :param breaker: The circuit breaker stopping requests to failing
+        endpoints, or None to always send requests.
+    :type breaker: :py:class:`~tastytopping.breaker.CircuitBreaker`
+    :param timeout: The time (in seconds) to wait for the API, either as a
+        single number or a (connect, read) tuple, or None to wait forever.
+    :type timeout: float or tuple
+    :param hooks: The callbacks to report each request to, or None.
+    :type hooks: :py:class:`~tastytopping.events.Hooks`
+    :param adapters: The requests transport adapters to send requests with, as
+        {url_prefix (str): adapter (requests.adapters.BaseAdapter)}, or None
+        to use the default adapters. Only used by the default transport.
+    :type adapters: dict
+    :param transport: A callable returning the transport to send requests
+        with, or None to use a
+        :py:class:`~tastytopping.transport.RequestsTransport`.
+    :type transport: callable
+    :param compress_requests: The size (in bytes) from which request bodies
+        are gzipped before they're sent, or None to never compress them.
+    :type compress_requests: int
     """
 
-    def __init__(self, address):
+    def __init__(
+            self,
+            address,
+            page_size=None,
+            cache=None,
+            retry=None,
+            throttle=None,
+            breaker=None,
+            timeout=None,
+            hooks=None,
+            adapters=None,
+            transport=None,
+            compress_requests=None,
+    ):
         self._addr = address
         if not address.endswith('/'):
             self._addr += '/'
-        self._sess = None
-        self._sess_lock = PickleLock()
+        self._trans = None
+        self._trans_lock = PickleLock()
         self._auth = None
         self._auth_lock = PickleLock()
         self.verify = True
-
-    def _session(self):
-        if self._sess is None:
-            with self._sess_lock:
-                if self._sess is None:
-                    self._sess = requests.session()
-        return self._sess
-
-    def _transmit(self, tx_func, url, params=None, data=None):
+        self.page_size = page_size
+        self.cache = cache
+        self.retry = retry
+        self.throttle = throttle
+        self.breaker = breaker
+        self.timeout = timeout
+        self.hooks = hooks
+        self.adapters = adapters
+        self.transport = transport
+        self.compress_requests = compress_requests
+        self._flights = {}
+        self._flights_lock = PickleLock()
+
+    def _transport(self):
+        if self._trans is None:
+            with self._trans_lock:
+                if self._trans is None:
+                    if self.transport is None:
+                        self._trans = RequestsTransport(self.adapters)
+                    else:
+                        self._trans = self.transport()
+        return self._trans
+
+    def _send(self, method, url, params=None, data=None):
+        if method == 'GET':
+            return self._send_get_once(url, params)
+        try:
+            return self._request(method, url, params, data)
+        finally:
+            if self.cache is not None:
+                self.cache.invalidate(self._list_url(url))
+
+    def _list_url(self, url):
+        if not url.startswith(self._addr):
+            return url
+        resource_name = url[len(self._addr):].split('/', 1)[0]
+        return self._addr + resource_name + '/' if resource_name else self._addr
+
+    def _cached_get(self, url, params):
+        if self.cache is None:
+            return self._request('GET', url, params)
+        list_url = self._list_url(url)
+        auth = None if self.auth is None else id(self.auth)
+        response = self.cache.get(list_url, url, params, auth)
+        if response is None:
+            response = self._request('GET', url, params)
+            self.cache.set(list_url, url, params, response, auth)
+        elif self._reporting():
+            event = self._event('GET', url, response.status_code, 0, len(response.content))
+            event.cached = True
+            response._tastytopping_event = event
+        return response
+
+    def _reporting(self):
+        return self.hooks is not None or bool(stats.active())
+
+    def _report(self, event):
+        if self.hooks is not None:
+            self.hooks.request(event)
+        stats.record_request(event)
+
+    def _event(self, method, url, status=None, bytes_sent=0, bytes_received=0):
+        event = RequestEvent(method, url, url_template(self._addr, url), status, bytes_sent, bytes_received)
+        event.resource_name = self._list_url(url)[len(self._addr):].rstrip('/')
+        return event
+
+    def _send_get_once(self, url, params):
+        # Identical GETs sent at the same time (with the same auth) share a single request.
+        key = (url, tuple(sorted((k, _normalise_param(v)) for k, v in (params or {}).items())), id(self.auth))
+        with self._flights_lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+        if not leader:
+            if not flight.done.wait(remaining_time()):
+                raise DeadlineExceeded(url, 'GET')
+            if flight.error is not None:
+                raise _own_copy(flight.error)
+            return flight.response
+        try:
+            flight.response = self._cached_get(url, params)
+            # Read the body now, so that each thread only decodes it.
+            flight.response.content
+        except Exception as err:
+            flight.error = err
+            raise
+        finally:
+            with self._flights_lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.response
+
+    def _request(self, method, url, params=None, data=None):
         if data:
             data = json.dumps(data)
+        body, headers = self._encode(data)
+        if self.retry is not None:
+            self.retry.record_request()
+        attempt = 0
+        while True:
+            try:
+                response = self._send_attempt(method, url, params, body, headers)
+                response.raise_for_status()
+                return response
+            except requests.exceptions.HTTPError as err:
+                if self._wait_to_retry(method, attempt, response):
+                    attempt += 1
+                    continue
+                if response.status_code == 404 or response.status_code == 410:
+                    raise ResourceDeleted(url)
+                if response.status_code == 405:
+                    raise RestMethodNotAllowed(err, url, method)
+                raise ErrorResponse(response.text, err, url, params, data)
+            except requests.exceptions.Timeout as err:
+                if self._wait_to_retry(method, attempt):
+                    attempt += 1
+                    continue
+                left = remaining_time()
+                if left is not None and left <= 0:
+                    raise DeadlineExceeded(url, method)
+                raise RequestTimeout(url, method, err)
+            except requests.exceptions.ConnectionError as err:
+                if self._wait_to_retry(method, attempt):
+                    attempt += 1
+                    continue
+                raise CannotConnectToAddress(self.address())
+
+    def _request_timeout(self, url, method):
+        left = remaining_time()
+        if left is None:
+            return self.timeout
+        if left <= 0:
+            raise DeadlineExceeded(url, method)
+        if self.timeout is None:
+            return left
+        try:
+            connect, read = self.timeout
+        except TypeError:
+            connect = read = self.timeout
+        # Never wait past the deadline, whichever timeout is hit.
+        return tuple(left if t is None else min(t, left) for t in (connect, read))
+
+    def _send_attempt(self, method, url, params, data, headers):
+        endpoint = self._list_url(url)
+        if self.breaker is not None:
+            self.breaker.check(endpoint)
+        with self._throttled(url, method):
+            # Only count the time remaining once the throttle has let the request through.
+            timeout = self._request_timeout(url, method)
+            start = time.time()
+            failed = True
+            try:
+                response = self._transport().request(
+                    method,
+                    url,
+                    params=params,
+                    data=data,
+                    headers=headers,
+                    auth=self.auth,
+                    verify=self.verify,
+                    timeout=timeout,
+                )
+                failed = response.status_code >= 500
+            except Exception as err:
+                if self._reporting():
+                    event = self._event(method, url, bytes_sent=len(data or ''))
+                    event.ttfb = time.time() - start
+                    event.error = err
+                    self._report(event)
+                raise
+            finally:
+                if self.breaker is not None:
+                    self.breaker.record(endpoint, failed, time.time() - start)
+        if self._reporting():
+            self._track(response, method, url, data, time.time() - start)
+        return response
+
+    def _track(self, response, method, url, data, elapsed):
+        event = self._event(method, url, response.status_code, len(data or ''), len(response.content))
+        # The body has already been downloaded by the time requests returns.
+        event.ttfb = min(elapsed, response.elapsed.total_seconds())
+        event.download_time = elapsed - event.ttfb
+        if response.status_code >= 400:
+            # Error responses are never decoded.
+            self._report(event)
+        else:
+            response._tastytopping_event = event
+
+    def _throttled(self, url, method):
+        if self.throttle is None:
+            return _NOT_THROTTLED
+        return self.throttle.request(url, method)
+
+    def _wait_to_retry(self, method, attempt, response=None):
+        if self.retry is None:
+            return False
+        left = remaining_time()
+        if left is not None and left <= 0:
+            return False
+        delay = self.retry.delay(method, attempt, response)
+        if delay is None or (left is not None and delay >= left):
+            return False
+        time.sleep(delay)
+        return True
+
+    def _decode(self, response, url, params=None, data=None):
+        # Only the first thread to decode a shared response reports it.
+        event = response.__dict__.pop('_tastytopping_event', None)
+        if event is None:
+            return self._decode_json(response, url, params, data)
+        start = time.time()
+        result = None
+        try:
+            result = self._decode_json(response, url, params, data)
+            return result
+        finally:
+            event.decode_time = time.time() - start
+            if isinstance(result, dict) and isinstance(result.get('objects'), list):
+                event.objects = len(result['objects'])
+            self._report(event)
+
+    @staticmethod
+    def _decode_json(response, url, params=None, data=None):
         try:
-            response = tx_func(
-                url,
-                params=params,
-                data=data,
-                headers=self._headers(),
-                auth=self.auth,
-                verify=self.verify,
-            )
-            response.raise_for_status()
             return response.json()
         except (ValueError, TypeError) as err:
-            try:
-                if response.text:
-                    args = (response.text, err, url, params, data)
-                    if 'NotFound: Invalid resource' in response.text:
-                        raise AttributeError(*args)
-                    if 'KeyError: ' in response.text:
-                        raise IncorrectNestedResourceKwargs(*args)
-                    raise ErrorResponse(*args)
-            # If it was raised before the request was sent, it wasn't a JSON error.
-            except UnboundLocalError:
-                raise err
-        except requests.exceptions.HTTPError as err:
-            if response.status_code == 404 or response.status_code == 410:
-                raise ResourceDeleted(url)
-            if response.status_code == 405:
-                raise RestMethodNotAllowed(err, url, tx_func)
-            raise ErrorResponse(response.text, err, url, params, data)
-        except requests.exceptions.ConnectionError as err:
-            raise CannotConnectToAddress(self.address())
+            if response.text:
+                args = (response.text, err, url, params, data)
+                if 'NotFound: Invalid resource' in response.text:
+                    raise AttributeError(*args)
+                if 'KeyError: ' in response.text:
+                    raise IncorrectNestedResourceKwargs(*args)
+                raise ErrorResponse(*args)
+
+    def _get_page(self, list_url, url, params):
+        start = time.time()
+        response = self._send('GET', url, params=params)
+        result = self._decode(response, url, params)
+        if self.page_size is not None:
+            self.page_size.record(
+                list_url,
+                int(params.get('limit', 0)),
+                len(result['objects']),
+                time.time() - start,
+                len(response.content),
+                int(result['meta']['limit']),
+            )
+        return result
+
+    def _page_limit(self, url, remaining):
+        if self.page_size is None:
+            return remaining
+        if remaining is None:
+            return self.page_size.limit(url)
+        return min(remaining, self.page_size.limit(url))
+
+    def _transmit(self, method, url, params=None, data=None):
+        response = self._send(method, url, params=params, data=data)
+        return self._decode(response, url, params, data)
 
     @staticmethod
     def _headers():
         return {
             'accept': 'application/json',
+            'accept-encoding': _ACCEPT_ENCODING,
             'content-type': 'application/json',
         }
 
+    def _encode(self, data):
+        headers = self._headers()
+        if data and self.compress_requests is not None:
+            body = data.encode('utf-8')
+            if len(body) >= self.compress_requests:
+                headers['content-encoding'] = 'gzip'
+                return _gzip(body), headers
+        return data, headers
+
     def _set_auth(self, auth):
         with self._auth_lock:
             try:
@@ -101,7 +437,7 @@ class TastyApi(object):
                 pass
             else:
                 if current_csrf is None:
-                    auth.extract_csrf_token(self._session().cookies)
+                    auth.extract_csrf_token(self._transport().cookies)
             self._auth = auth
 
     def _get_auth(self):
@@ -135,15 +471,27 @@ class TastyApi(object):
         :returns: A generator object that yields dicts.
         :rtype: dict
         """
-        limit = kwargs.get('limit', 0) or 1000000000    # Stupidly large number to simulate 'unlimited'.
-        result = self._transmit(self._session().get, url, params=kwargs)
-        limit -= int(result['meta']['limit'])
-        yield result
-        while result['meta']['next'] and limit > 0:
-            url = self.create_full_uri(result['meta']['next'])
-            result = self._transmit(self._session().get, url, params={'limit': limit})
-            limit -= int(result['meta']['limit'])
+        params = kwargs.copy()
+        # No limit (or a limit of 0) means retrieve every remaining resource.
+        remaining = int(params.get('limit') or 0) or None
+        offset = int(params.get('offset') or 0)
+        while True:
+            limit = self._page_limit(url, remaining)
+            if limit is not None:
+                params['limit'] = limit
+            result = self._get_page(url, url, params)
             yield result
+            returned = len(result['objects'])
+            server_limit = int(result['meta']['limit'])
+            if remaining is not None:
+                remaining -= returned
+            if remaining == 0 or not returned or not result['meta']['next']:
+                break
+            # A page shorter than the server's limit must be the last one.
+            if server_limit and returned < server_limit:
+                break
+            offset += returned
+            params['offset'] = offset
 
     def get(self, url, **kwargs):
         """Retrieve the fields for a given URI.
@@ -155,7 +503,7 @@ class TastyApi(object):
         :returns: The resource's fields.
         :rtype: dict
         """
-        return self._transmit(self._session().get, url, params=kwargs)
+        return self._transmit('GET', url, params=kwargs)
 
     def post(self, url, **kwargs):
         """Add a new resource with the given fields.
@@ -166,11 +514,17 @@ class TastyApi(object):
         :type resource_type: str
         :param schema: The schema to use for validation.
         :type schema: TastySchema
-        :returns: Either the resource fields or an empty dict, depending on how
-            the Resource was defined in the tastypie API (always_return_data).
+        :returns: Either the resource fields, or only the 'resource_uri' taken
+            from the Location header, depending on how the Resource was defined
+            in the tastypie API (always_return_data).
         :rtype: dict
         """
-        return self._transmit(self._session().post, url, data=kwargs) or {}
+        response = self._send('POST', url, data=kwargs)
+        details = self._decode(response, url, data=kwargs) or {}
+        # Without the data, the Location header at least identifies the new resource.
+        if not details and response.headers.get('location'):
+            details = {'resource_uri': urlparse(response.headers['location']).path}
+        return details
 
     def put(self, url, **kwargs):
         """Put a given resource with the given fields.
@@ -185,7 +539,7 @@ class TastyApi(object):
             the Resource was defined in the tastypie API (always_return_data).
         :rtype: dict
         """
-        return self._transmit(self._session().put, url, data=kwargs) or {}
+        return self._transmit('PUT', url, data=kwargs) or {}
 
     def patch(self, url, **kwargs):
         """Patch a given resource with the given fields.
@@ -200,7 +554,7 @@ class TastyApi(object):
             the Resource was defined in the tastypie API (always_return_data).
         :rtype: dict
         """
-        return self._transmit(self._session().patch, url, data=kwargs) or {}
+        return self._transmit('PATCH', url, data=kwargs) or {}
 
     def delete(self, url):
         """Remove a given resource from the API.
@@ -210,7 +564,7 @@ class TastyApi(object):
         :param schema: The schema to use for validation.
         :type schema: TastySchema
         """
-        self._transmit(self._session().delete, url)
+        self._transmit('DELETE', url)
 
     def bulk(self, url, schema, resources, delete):
         """Create, update, and delete multiple resources.
@@ -227,7 +581,7 @@ class TastyApi(object):
         schema.check_list_request_allowed('patch')
         data = {'objects': resources, 'deleted_objects': delete}
         # No result is returned in a 202 response.
-        self._transmit(self._session().patch, url, data=data)
+        self._transmit('PATCH', url, data=data)
 
     def schema(self, url):
         """Retrieve the schema for a given resource type.
@@ -238,7 +592,7 @@ class TastyApi(object):
         :rtype: TastySchema
         """
         url += 'schema/'
-        schema_dict = self._transmit(self._session().get, url)
+        schema_dict = self._transmit('GET', url)
         return TastySchema(schema_dict, url)
 
     def resources(self):
@@ -248,4 +602,4 @@ class TastyApi(object):
         :rtype: list
         :raises: CannotConnectToAddress
         """
-        return self._transmit(self._session().get, self.address()).keys()
+        return self._transmit('GET', self.address()).keys()
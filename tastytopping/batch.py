@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module: batch
+    :platform: Unix, Windows
+    :synopsis: Queue saves and deletes to send them as bulk requests.
+
+.. moduleauthor:: Christian Boelsen <christian.boelsen@hds.com>
+"""
+
+
+__all__ = ('Batch', )
+
+
+from collections import OrderedDict
+
+from .exceptions import RestMethodNotAllowed
+
+
+class Batch(object):
+    """A unit of work that queues saves and deletes of existing Resources.
+
+    Rather than being sent immediately, the queued changes are sent when the
+    Batch is flushed, using a
+    :py:meth:`~tastytopping.resource.Resource.bulk` request per resource type.
+    Batches are normally created with
+    :py:meth:`~tastytopping.ResourceFactory.batch`, rather than directly.
+
+    :param max_size: The maximum number of resources to send in a single bulk
+        request, or None for no limit.
+    :type max_size: int
+    """
+
+    def __init__(self, max_size=None):
+        self._max_size = max_size
+        self._updates = OrderedDict()
+        self._deletes = OrderedDict()
+
+    def __len__(self):
+        return len(self._updates) + len(self._deletes)
+
+    def save(self, resource):
+        """Queue the resource's changed fields to be saved.
+
+        :param resource: The resource to save.
+        :type resource: :py:class:`~tastytopping.resource.Resource`
+        """
+        if id(resource) not in self._deletes:
+            self._updates[id(resource)] = resource
+
+    def delete(self, resource):
+        """Queue the resource to be deleted.
+
+        :param resource: The resource to delete.
+        :type resource: :py:class:`~tastytopping.resource.Resource`
+        """
+        self._updates.pop(id(resource), None)
+        self._deletes[id(resource)] = resource
+
+    def discard(self):
+        """Empty the queue without sending it, and undo the unsaved changes to
+        the queued resources, so that a later save doesn't send them.
+        """
+        for resource in self._updates.values():
+            resource._discard_changes()
+        self._updates = OrderedDict()
+        self._deletes = OrderedDict()
+
+    def _group_by_resource_type(self):
+        groups = OrderedDict()
+        for queue, index in ((self._updates, 1), (self._deletes, 2)):
+            for resource in queue.values():
+                # Derived Resource classes share the same resource type.
+                group = groups.setdefault(resource._full_name(), (type(resource), [], []))
+                group[index].append(resource)
+        return groups.values()
+
+    @staticmethod
+    def _send_individually(update, delete):
+        for resource in update:
+            resource.save()
+        for resource in delete:
+            resource.delete()
+
+    def flush(self):
+        """Send all queued changes to the API, and empty the queue."""
+        groups = self._group_by_resource_type()
+        self._updates = OrderedDict()
+        self._deletes = OrderedDict()
+        for resource_class, update, delete in groups:
+            try:
+                resource_class._schema().check_list_request_allowed('patch')
+            except RestMethodNotAllowed:
+                self._send_individually(update, delete)
+                continue
+            # Send the updates and deletes together, in as few requests as allowed.
+            size = self._max_size or len(update) + len(delete)
+            while update or delete:
+                update_chunk, update = update[:size], update[size:]
+                remaining = size - len(update_chunk)
+                delete_chunk, delete = delete[:remaining], delete[remaining:]
+                resource_class.bulk(update=update_chunk, delete=delete_chunk)
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module: breaker
+    :platform: Unix, Windows
+    :synopsis: Stop sending requests to endpoints that keep failing.
+
+.. moduleauthor:: Christian Boelsen <christian.boelsen@hds.com>
+"""
+
+
+__all__ = ('CircuitBreaker', )
+
+
+import time
+
+from .exceptions import CircuitOpen
+from .lock import PickleLock
+
+
+class _Circuit(object):
+    """The state of a single endpoint's circuit."""
+
+    def __init__(self):
+        self.state = CircuitBreaker.CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+
+class CircuitBreaker(object):
+    """Fail fast when an endpoint (ie. a resource's list URL, and everything
+    beneath it) keeps failing, rather than tying up threads and connections
+    waiting for it.
+
+    Each endpoint's circuit starts closed, letting every request through.
+    After ``failure_threshold`` consecutive failures (connection errors,
+    5xx responses, or responses slower than ``latency_threshold``) the
+    circuit opens, and requests raise
+    :py:class:`~tastytopping.exceptions.CircuitOpen` without being sent. Once
+    ``reset_timeout`` seconds have passed, the circuit is half-open: a single
+    request is let through to probe the endpoint, which closes the circuit if
+    it succeeds, or opens it again if it fails.
+
+    Pass a CircuitBreaker to :py:class:`~tastytopping.ResourceFactory` to use
+    it for all of its resources::
+
+        >>> breaker = CircuitBreaker(failure_threshold=3, latency_threshold=10)
+        >>> factory = ResourceFactory('http://localhost/app_name/api/v1/', breaker=breaker)
+        >>> breaker.states()
+        {'http://localhost/app_name/api/v1/entry/': 'closed'}
+
+    :param failure_threshold: The number of consecutive failures that open
+        the circuit.
+    :type failure_threshold: int
+    :param latency_threshold: The time (in seconds) after which a successful
+        response still counts as a failure, or None to ignore latency.
+    :type latency_threshold: float
+    :param reset_timeout: The time (in seconds) to wait before probing an
+        endpoint whose circuit is open.
+    :type reset_timeout: float
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, failure_threshold=5, latency_threshold=None, reset_timeout=30.0):
+        self._failure_threshold = failure_threshold
+        self._latency_threshold = latency_threshold
+        self._reset_timeout = reset_timeout
+        self._circuits = {}
+        self._lock = PickleLock()
+
+    def _circuit(self, endpoint):
+        if endpoint not in self._circuits:
+            self._circuits[endpoint] = _Circuit()
+        return self._circuits[endpoint]
+
+    def _update_state(self, circuit):
+        if circuit.state == self.OPEN and time.time() - circuit.opened_at >= self._reset_timeout:
+            circuit.state = self.HALF_OPEN
+
+    def state(self, endpoint):
+        """Return the state of an endpoint's circuit.
+
+        :param endpoint: The URL of the resource's list endpoint.
+        :type endpoint: str
+        :returns: One of CircuitBreaker.CLOSED, OPEN, or HALF_OPEN.
+        :rtype: str
+        """
+        with self._lock:
+            circuit = self._circuit(endpoint)
+            self._update_state(circuit)
+            return circuit.state
+
+    def states(self):
+        """Return the state of every endpoint's circuit.
+
+        :returns: The states, as {endpoint (str): state (str)}.
+        :rtype: dict
+        """
+        with self._lock:
+            for circuit in self._circuits.values():
+                self._update_state(circuit)
+            return {endpoint: circuit.state for endpoint, circuit in self._circuits.items()}
+
+    def check(self, endpoint):
+        """Check whether a request can be sent to the endpoint.
+
+        :param endpoint: The URL of the resource's list endpoint.
+        :type endpoint: str
+        :raises: CircuitOpen
+        """
+        with self._lock:
+            circuit = self._circuit(endpoint)
+            self._update_state(circuit)
+            if circuit.state == self.CLOSED:
+                return
+            if circuit.state == self.HALF_OPEN and not circuit.probing:
+                circuit.probing = True
+                return
+        raise CircuitOpen(endpoint, circuit.state)
+
+    def record(self, endpoint, failed, elapsed):
+        """Record the result of a request sent to the endpoint.
+
+        :param endpoint: The URL of the resource's list endpoint.
+        :type endpoint: str
+        :param failed: Whether the request failed.
+        :type failed: bool
+        :param elapsed: The time (in seconds) the request took.
+        :type elapsed: float
+        """
+        if self._latency_threshold is not None and elapsed > self._latency_threshold:
+            failed = True
+        with self._lock:
+            circuit = self._circuit(endpoint)
+            circuit.probing = False
+            if not failed:
+                circuit.state = self.CLOSED
+                circuit.failures = 0
+                return
+            circuit.failures += 1
+            if circuit.state == self.HALF_OPEN or circuit.failures >= self._failure_threshold:
+                circuit.state = self.OPEN
+                circuit.opened_at = time.time()
@@ -0,0 +1,320 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module: cache
+    :platform: Unix, Windows
+    :synopsis: Cache the API's responses to GET requests.
+
+.. moduleauthor:: Christian Boelsen <christian.boelsen@hds.com>
+"""
+
+
+__all__ = ('BaseCache', 'MemoryCache', 'DiskCache', )
+
+
+import abc
+from collections import OrderedDict
+from email.utils import parsedate_tz, mktime_tz
+import hashlib
+import os
+import pickle
+import shutil
+import tempfile
+import time
+
+import requests
+from requests.structures import CaseInsensitiveDict
+try:
+    from urllib.parse import urlencode
+except ImportError:     # For python < 3
+    from urllib import urlencode
+
+from .lock import PickleLock
+
+
+try:
+    abc.ABC
+except AttributeError:
+    abc.ABC = abc.ABCMeta('ABC', (object, ), {})    # For python < 3.4
+
+
+def _parse_cache_control(header):
+    directives = {}
+    for directive in header.split(','):
+        name, _, value = directive.strip().partition('=')
+        if name:
+            directives[name.lower()] = value.strip('"')
+    return directives
+
+
+def _parse_date(header):
+    parsed = parsedate_tz(header) if header else None
+    return mktime_tz(parsed) if parsed else None
+
+
+def _server_lifetime(headers):
+    directives = _parse_cache_control(headers.get('cache-control', ''))
+    if 'no-store' in directives or 'no-cache' in directives:
+        return 0
+    if 'max-age' in directives:
+        try:
+            return int(directives['max-age']) - int(headers.get('age', 0))
+        except ValueError:
+            return 0
+    if 'expires' in headers:
+        expires = _parse_date(headers['expires'])
+        date = _parse_date(headers.get('date')) or time.time()
+        # Invalid dates (eg. "0") mean the response has already expired.
+        return expires - date if expires else 0
+    return None
+
+
+class _CachedResponse(object):
+    """The parts of a requests.Response that are kept in the cache."""
+
+    def __init__(self, response, expires):
+        self.expires = expires
+        self.status_code = response.status_code
+        self.headers = dict(response.headers)
+        self.content = response.content
+        self.encoding = response.encoding
+        self.url = response.url
+
+    def response(self):
+        """Return a new requests.Response equivalent to the one cached."""
+        response = requests.Response()
+        response.status_code = self.status_code
+        response.headers = CaseInsensitiveDict(self.headers)
+        response._content = self.content
+        response.encoding = self.encoding
+        response.url = self.url
+        return response
+
+
+class BaseCache(abc.ABC):
+    """Caches the responses to GET requests, for as long as the server says
+    they remain fresh (using the ``Cache-Control`` and ``Expires`` headers).
+
+    Sending a POST, PUT, PATCH, or DELETE request for a resource invalidates
+    every cached response for that type of resource.
+
+    Responses are cached separately for each auth. Responses to authenticated
+    requests are only cached when the server marks them ``Cache-Control:
+    public``, and responses that vary on every header (``Vary: *``) are never
+    cached.
+
+    :param timeout: The time (in seconds) to cache responses for which the
+        server gave no freshness information.
+    :type timeout: int
+    :param timeouts: Per-resource overrides of the server's freshness
+        information, as {resource_name (str): timeout (int)}. A timeout of 0
+        means never cache the resource's responses.
+    :type timeouts: dict
+    """
+
+    def __init__(self, timeout=0, timeouts=None):
+        self._timeout = timeout
+        self._timeouts = timeouts or {}
+
+    @staticmethod
+    def _key(url, params, auth):
+        query = urlencode(sorted((params or {}).items(), key=lambda item: item[0]), doseq=True)
+        key = url + '?' + query
+        return key if auth is None else key + '#' + str(auth)
+
+    def _lifetime(self, list_url, headers, auth):
+        directives = _parse_cache_control(headers.get('cache-control', ''))
+        if 'no-store' in directives or headers.get('vary', '').strip() == '*':
+            return 0
+        # The cache may outlive (or be shared beyond) the auth that fetched a
+        # response, so only responses that anyone may see are kept.
+        if auth is not None and ('public' not in directives or 'private' in directives):
+            return 0
+        resource_name = list_url.rstrip('/').rsplit('/', 1)[-1]
+        if resource_name in self._timeouts:
+            return self._timeouts[resource_name]
+        lifetime = _server_lifetime(headers)
+        return self._timeout if lifetime is None else lifetime
+
+    def get(self, list_url, url, params=None, auth=None):
+        """Return the cached response to a GET request, if it's still fresh.
+
+        :param list_url: The URL of the resource's list endpoint.
+        :type list_url: str
+        :param url: The URL the GET request is sent to.
+        :type url: str
+        :param params: The GET request's parameters.
+        :type params: dict
+        :param auth: Identifies the auth the request is sent with, or None if
+            the request isn't authenticated.
+        :type auth: int
+        :returns: The cached response, or None if it isn't cached.
+        :rtype: requests.Response
+        """
+        key = self._key(url, params, auth)
+        cached = self._get(list_url, key)
+        if cached is None:
+            return None
+        if cached.expires <= time.time():
+            self._delete(list_url, key)
+            return None
+        return cached.response()
+
+    def set(self, list_url, url, params, response, auth=None):
+        """Cache the response to a GET request, if the response allows it.
+
+        :param list_url: The URL of the resource's list endpoint.
+        :type list_url: str
+        :param url: The URL the GET request was sent to.
+        :type url: str
+        :param params: The GET request's parameters.
+        :type params: dict
+        :param response: The response to cache.
+        :type response: requests.Response
+        :param auth: See :py:meth:`get`.
+        :type auth: int
+        """
+        if response.status_code != 200:
+            return
+        lifetime = self._lifetime(list_url, response.headers, auth)
+        if lifetime > 0:
+            key = self._key(url, params, auth)
+            self._set(list_url, key, _CachedResponse(response, time.time() + lifetime))
+
+    def invalidate(self, list_url):
+        """Remove every cached response for a type of resource.
+
+        :param list_url: The URL of the resource's list endpoint.
+        :type list_url: str
+        """
+        self._invalidate(list_url)
+
+    @abc.abstractmethod
+    def clear(self):
+        """Remove every cached response."""
+
+    @abc.abstractmethod
+    def _get(self, list_url, key):
+        pass
+
+    @abc.abstractmethod
+    def _set(self, list_url, key, cached):
+        pass
+
+    @abc.abstractmethod
+    def _delete(self, list_url, key):
+        pass
+
+    @abc.abstractmethod
+    def _invalidate(self, list_url):
+        pass
+
+
+class MemoryCache(BaseCache):
+    """A :py:class:`BaseCache` keeping the most recently used responses in
+    memory.
+
+    :param max_size: The maximum number of responses to keep.
+    :type max_size: int
+    :param timeout: See :py:class:`BaseCache`.
+    :type timeout: int
+    :param timeouts: See :py:class:`BaseCache`.
+    :type timeouts: dict
+    """
+
+    def __init__(self, max_size=1000, timeout=0, timeouts=None):
+        super(MemoryCache, self).__init__(timeout, timeouts)
+        self._max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = PickleLock()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _get(self, list_url, key):
+        with self._lock:
+            cached = self._entries.pop((list_url, key), None)
+            if cached is not None:
+                self._entries[(list_url, key)] = cached
+            return cached
+
+    def _set(self, list_url, key, cached):
+        with self._lock:
+            self._entries.pop((list_url, key), None)
+            self._entries[(list_url, key)] = cached
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def _delete(self, list_url, key):
+        with self._lock:
+            self._entries.pop((list_url, key), None)
+
+    def _invalidate(self, list_url):
+        with self._lock:
+            for entry in [e for e in self._entries if e[0] == list_url]:
+                del self._entries[entry]
+
+
+class DiskCache(BaseCache):
+    """A :py:class:`BaseCache` keeping responses in files, so that they can be
+    shared between processes, and outlive them.
+
+    :param directory: The directory to keep the responses in.
+    :type directory: str
+    :param timeout: See :py:class:`BaseCache`.
+    :type timeout: int
+    :param timeouts: See :py:class:`BaseCache`.
+    :type timeouts: dict
+    """
+
+    def __init__(self, directory, timeout=0, timeouts=None):
+        super(DiskCache, self).__init__(timeout, timeouts)
+        self._directory = directory
+
+    @staticmethod
+    def _hash(value):
+        return hashlib.sha1(value.encode('utf-8')).hexdigest()
+
+    def _resource_dir(self, list_url):
+        return os.path.join(self._directory, self._hash(list_url))
+
+    def _path(self, list_url, key):
+        return os.path.join(self._resource_dir(list_url), self._hash(key))
+
+    def clear(self):
+        shutil.rmtree(self._directory, ignore_errors=True)
+
+    def _get(self, list_url, key):
+        try:
+            with open(self._path(list_url, key), 'rb') as cache_file:
+                return pickle.load(cache_file)
+        except (IOError, OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+    def _set(self, list_url, key, cached):
+        resource_dir = self._resource_dir(list_url)
+        try:
+            os.makedirs(resource_dir)
+        except OSError:
+            if not os.path.isdir(resource_dir):
+                raise
+        # Write to a temporary file first, so that readers never see half a response.
+        handle, temp_path = tempfile.mkstemp(dir=resource_dir)
+        with os.fdopen(handle, 'wb') as cache_file:
+            pickle.dump(cached, cache_file, 2)
+        path = self._path(list_url, key)
+        try:
+            os.rename(temp_path, path)
+        except OSError:     # Windows won't rename over an existing file.
+            self._delete(list_url, key)
+            os.rename(temp_path, path)
+
+    def _delete(self, list_url, key):
+        try:
+            os.remove(self._path(list_url, key))
+        except OSError:
+            pass
+
+    def _invalidate(self, list_url):
+        shutil.rmtree(self._resource_dir(list_url), ignore_errors=True)
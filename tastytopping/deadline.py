@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module: deadline
+    :platform: Unix, Windows
+    :synopsis: Limit the total time taken by a block of requests.
+
+.. moduleauthor:: Christian Boelsen <christian.boelsen@hds.com>
+"""
+
+
+__all__ = ('deadline', 'remaining_time', )
+
+
+from contextlib import contextmanager
+from threading import local
+import time
+
+
+_LOCAL = local()
+
+
+@contextmanager
+def deadline(seconds):
+    """A context manager giving every request sent inside it (by the current
+    thread) a single, shared time budget.
+
+    Each request's timeout is shortened to the time remaining, and once the
+    time has run out, requests raise
+    :py:class:`~tastytopping.exceptions.DeadlineExceeded` instead of being
+    sent. This makes it possible to bound operations that send many requests,
+    like iterating over a :py:class:`~tastytopping.queryset.QuerySet`::
+
+        >>> with deadline(30):
+        ...     for entry in factory.entry.all():
+        ...         print(entry.title)
+
+    Nested deadlines can only shorten the time remaining, never extend it.
+
+    :param seconds: The time (in seconds) the block is allowed to take.
+    :type seconds: float
+    """
+    previous = getattr(_LOCAL, 'expires', None)
+    expires = time.time() + seconds
+    if previous is not None:
+        expires = min(previous, expires)
+    _LOCAL.expires = expires
+    try:
+        yield
+    finally:
+        _LOCAL.expires = previous
+
+
+def remaining_time():
+    """Return the time remaining before the current thread's deadline.
+
+    :returns: The time remaining (in seconds), which is negative once the
+        deadline has passed, or None if there's no deadline.
+    :rtype: float
+    """
+    expires = getattr(_LOCAL, 'expires', None)
+    if expires is None:
+        return None
+    return expires - time.time()
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module: descriptor
+    :platform: Unix, Windows
+    :synopsis: Compile a resource's schema into per-field descriptors.
+
+.. moduleauthor:: Christian Boelsen <christian.boelsen@hds.com>
+"""
+
+
+__all__ = ('FieldDescriptor', 'install_descriptors', )
+
+
+from .exceptions import NoDefaultValueInSchema
+from .field import field_decoder
+
+
+_NO_DEFAULT = object()
+
+
+class FieldDescriptor(object):
+    """A data descriptor giving access to a single field of a Resource.
+
+    Everything that would otherwise be looked up in the schema on each read
+    (the Field type and the field's default) is worked out once, when the
+    descriptor is created. Values assigned are still validated by the schema.
+
+    :param name: The name of the field.
+    :type name: str
+    :param schema: The schema of the Resource the field belongs to.
+    :type schema: TastySchema
+    """
+
+    def __init__(self, name, schema):
+        self.name = name
+        self._schema = schema
+        field_desc = schema.field(name)
+        self.decode = field_decoder(field_desc['type'])
+        try:
+            self.default = schema.default(name)
+        except NoDefaultValueInSchema:
+            self.default = _NO_DEFAULT
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        obj.check_alive()
+        try:
+            return obj._fields()[self.name].value()
+        except KeyError:
+            pass
+        if self.default is _NO_DEFAULT:
+            raise NoDefaultValueInSchema(self.name)
+        return self.default
+
+    def __set__(self, obj, value):
+        obj.check_alive()
+        self._schema.validate(self.name, value)
+        obj._assign_fields({self.name: self.decode(value, obj._factory)})
+
+    def __reduce__(self):
+        return (FieldDescriptor, (self.name, self._schema))
+
+
+def install_descriptors(resource_class, schema):
+    """Add a FieldDescriptor to the resource_class for each field in the schema.
+
+    :param resource_class: The Resource class to compile the fields into.
+    :type resource_class: type
+    :param schema: The schema of the Resource.
+    :type schema: TastySchema
+    :returns: The descriptors added, as {name (str): descriptor (FieldDescriptor)}.
+        Fields named after the Resource's own members are left out.
+    :rtype: dict
+    """
+    descriptors = {}
+    for name in schema.field_names():
+        descriptor = FieldDescriptor(name, schema)
+        # Never hide the Resource's own members behind a field.
+        if isinstance(getattr(resource_class, name, descriptor), FieldDescriptor):
+            setattr(resource_class, name, descriptor)
+            descriptors[name] = descriptor
+    resource_class._field_descriptors = descriptors
+    return descriptors
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module: events
+    :platform: Unix, Windows
+    :synopsis: Report where the time is spent talking to the API.
+
+.. moduleauthor:: Christian Boelsen <christian.boelsen@hds.com>
+"""
+
+
+__all__ = ('Hooks', 'RequestEvent', 'FieldsEvent', 'url_template', )
+
+
+from .lock import PickleLock
+
+
+def url_template(address, url):
+    """Return the URL with any resource ID replaced with "{id}", so that
+    requests for different resources of the same type can be grouped.
+
+    :param address: The URL of the API.
+    :type address: str
+    :param url: The URL of the request.
+    :type url: str
+    :returns: The URL template (eg. http://localhost/api/v1/entry/{id}/).
+    :rtype: str
+    """
+    if not url.startswith(address):
+        return url
+    segments = url[len(address):].split('/')
+    if len(segments) > 2 and segments[1] and segments[1] != 'schema':
+        segments[1] = '{id}'
+    return address + '/'.join(segments)
+
+
+class RequestEvent(object):
+    """The details of a single request sent to the API (or answered by the
+    cache). Each retry of a request is reported separately.
+
+    :var method: (str) - The HTTP method of the request.
+    :var url: (str) - The URL of the request, without the query string.
+    :var url_template: (str) - The URL with any resource ID replaced (see
+        :py:func:`url_template`).
+    :var resource_name: (str) - The name of the resource the request was for.
+    :var status: (int) - The status code of the response, or None if no
+        response was received.
+    :var bytes_sent: (int) - The size of the request's body, as sent (ie.
+        after being compressed).
+    :var bytes_received: (int) - The size of the response's body, after
+        being decompressed.
+    :var cached: (bool) - Whether the response came from the cache, rather
+        than the API.
+    :var ttfb: (float) - The time (in seconds) from sending the request until
+        the response's headers arrived, which includes connecting.
+    :var download_time: (float) - The time (in seconds) taken to download the
+        response's body.
+    :var decode_time: (float) - The time (in seconds) taken to decode the
+        response's JSON.
+    :var objects: (int) - The number of resources in the response, if it was
+        a page of resources, or None.
+    :var error: (Exception) - The exception raised, if the request failed.
+    """
+
+    def __init__(self, method, url, template, status=None, bytes_sent=0, bytes_received=0, cached=False):
+        self.method = method
+        self.url = url
+        self.url_template = template
+        self.resource_name = None
+        self.status = status
+        self.bytes_sent = bytes_sent
+        self.bytes_received = bytes_received
+        self.cached = cached
+        self.ttfb = 0.0
+        self.download_time = 0.0
+        self.decode_time = 0.0
+        self.objects = None
+        self.error = None
+
+    @property
+    def elapsed(self):
+        """(float) - The total time (in seconds) spent on the request."""
+        return self.ttfb + self.download_time + self.decode_time
+
+    def __repr__(self):
+        return '<RequestEvent {0} {1} {2} ({3:.3f}s)>'.format(self.method, self.url_template, self.status, self.elapsed)
+
+
+class FieldsEvent(object):
+    """The details of the construction of a Resource's fields.
+
+    :var resource_name: (str) - The name of the Resource.
+    :var num_fields: (int) - The number of fields constructed.
+    :var elapsed: (float) - The time (in seconds) taken to construct the
+        fields.
+    """
+
+    def __init__(self, resource_name, num_fields, elapsed):
+        self.resource_name = resource_name
+        self.num_fields = num_fields
+        self.elapsed = elapsed
+
+    def __repr__(self):
+        return '<FieldsEvent {0} {1} ({2:.6f}s)>'.format(self.resource_name, self.num_fields, self.elapsed)
+
+
+class Hooks(object):
+    """A set of callbacks, called with the details of each request, and each
+    construction of a Resource's fields.
+
+    Pass a Hooks object to :py:class:`~tastytopping.ResourceFactory` to report
+    on all of its resources. Callbacks are called in the thread that sent the
+    request, so they should be quick (or hand the event to another thread)::
+
+        >>> hooks = Hooks()
+        >>> @hooks.on_request
+        ... def log_request(event):
+        ...     logger.info('%s %s: %.3fs', event.method, event.url_template, event.elapsed)
+        >>> factory = ResourceFactory('http://localhost/app_name/api/v1/', hooks=hooks)
+    """
+
+    def __init__(self):
+        self._request_hooks = []
+        self._fields_hooks = []
+        self._lock = PickleLock()
+
+    def on_request(self, callback):
+        """Add a callback to call with a :py:class:`RequestEvent` after each
+        request. Can be used as a decorator.
+
+        :param callback: The callback.
+        :type callback: callable
+        :returns: The callback.
+        :rtype: callable
+        """
+        with self._lock:
+            self._request_hooks = self._request_hooks + [callback]
+        return callback
+
+    def on_fields(self, callback):
+        """Add a callback to call with a :py:class:`FieldsEvent` after each
+        construction of a Resource's fields. Can be used as a decorator.
+
+        :param callback: The callback.
+        :type callback: callable
+        :returns: The callback.
+        :rtype: callable
+        """
+        with self._lock:
+            self._fields_hooks = self._fields_hooks + [callback]
+        return callback
+
+    def remove(self, callback):
+        """Remove a callback added with :py:meth:`on_request` or
+        :py:meth:`on_fields`.
+
+        :param callback: The callback.
+        :type callback: callable
+        """
+        with self._lock:
+            self._request_hooks = [h for h in self._request_hooks if h != callback]
+            self._fields_hooks = [h for h in self._fields_hooks if h != callback]
+
+    def request(self, event):
+        """Call each request callback with the event.
+
+        :param event: The details of the request.
+        :type event: RequestEvent
+        """
+        for callback in self._request_hooks:
+            callback(event)
+
+    def fields(self, event):
+        """Call each fields callback with the event.
+
+        :param event: The details of the fields' construction.
+        :type event: FieldsEvent
+        """
+        for callback in self._fields_hooks:
+            callback(event)
@@ -117,6 +117,40 @@ class CannotConnectToAddress(PrettyException):
     """Raised when no connection was possible at the given address."""
     pass
 
+class RequestTimeout(PrettyException):
+    """Raised when the API took longer to respond than the timeout allowed."""
+    pass
+
+class DeadlineExceeded(RequestTimeout):
+    """Raised when a request would be sent after the deadline has passed.
+
+    See :py:func:`~tastytopping.deadline.deadline`.
+    """
+    pass
+
+class CircuitOpen(PrettyException):
+    """Raised when a request isn't sent, because the endpoint kept failing.
+
+    See :py:class:`~tastytopping.breaker.CircuitBreaker`.
+    """
+    pass
+
+class NPlusOneQueries(PrettyException):
+    """Raised when the Resources returned by a QuerySet load the same type of
+    related Resource one request at a time.
+
+    See :py:class:`~tastytopping.nplusone.NPlusOneDetector`.
+    """
+    pass
+
+class NPlusOneWarning(UserWarning):
+    """Warned when the Resources returned by a QuerySet load the same type of
+    related Resource one request at a time.
+
+    See :py:class:`~tastytopping.nplusone.NPlusOneDetector`.
+    """
+    pass
+
 class IncorrectNestedResourceArgs(PrettyException):
     """Raised when failing to GET a nested resource.
 
@@ -12,11 +12,14 @@
 __all__ = ('ResourceFactory', )
 
 
-from threading import Lock
+from contextlib import contextmanager
+from threading import Lock, local
 
 
 from .api import TastyApi
+from .batch import Batch
 from .resource import Resource
+from .stats import QueryStats, collecting
 
 
 class ResourceFactory(object):
@@ -40,22 +43,100 @@ class ResourceFactory(object):
     :type api_url: str
     :param verify: Sets whether SSL certificates for the API should be verified.
     :type verify: bool
+    :param compile_fields: Sets whether each Resource class should compile its
+        schema into per-field descriptors (see
+        :py:attr:`~tastytopping.resource.Resource.compile_fields`).
+    :type compile_fields: bool
+    :param page_size: The policy deciding how many resources to request per
+        page when iterating over a QuerySet, or None to let the server decide.
+    :type page_size: :py:class:`~tastytopping.paging.AdaptivePageSize`
+    :param cache: The cache to keep responses to GET requests in, shared by
+        every resource, or None to not cache responses.
+    :type cache: :py:class:`~tastytopping.cache.BaseCache`
+    :param retry: The policy deciding which failed requests to retry, shared
+        by every resource, or None to never retry requests.
+    :type retry: :py:class:`~tastytopping.retry.RetryPolicy`
+    :param throttle: The limits on the rate and concurrency of requests to each
+        host, shared by every resource, or None to not limit requests.
+    :type throttle: :py:class:`~tastytopping.throttle.Throttle`
+    :param breaker: The circuit breaker stopping requests to failing endpoints,
+        shared by every resource, or None to always send requests.
+    :type breaker: :py:class:`~tastytopping.breaker.CircuitBreaker`
+    :param timeout: The time (in seconds) to wait for the API, either as a
+        single number or a (connect, read) tuple, or None to wait forever.
+        This can be overridden for each resource (see
+        :py:attr:`~tastytopping.resource.Resource.timeout`).
+    :type timeout: float or tuple
+    :param hooks: The callbacks to report each request, and each construction
+        of a Resource's fields, to.
+    :type hooks: :py:class:`~tastytopping.events.Hooks`
+    :param n_plus_one: The detector to warn or raise when the results of a
+        QuerySet load their related resources one request at a time, or None
+        to not check.
+    :type n_plus_one: :py:class:`~tastytopping.nplusone.NPlusOneDetector`
+    :param adapters: The requests transport adapters to send every request
+        with, as {url_prefix (str): adapter (requests.adapters.BaseAdapter)},
+        or None to use the default adapters. This makes it possible to answer
+        requests without a server (eg. in tests or benchmarks).
+    :type adapters: dict
+    :param transport: A callable returning a new transport to send requests
+        with (eg. a :py:class:`~tastytopping.transport.Transport` subclass),
+        called once for each Resource class, or None to send requests using
+        requests. The adapters are only used by the default transport.
+    :type transport: callable
+    :param compress_requests: The size (in bytes) from which request bodies
+        (eg. from bulk() or create() with many resources) are gzipped before
+        they're sent, or None to never compress them. The API has to
+        decompress the requests itself, which tastypie doesn't do by default.
+    :type compress_requests: int
     :var resources: (list) - The names of each
         :py:class:`~tastytopping.resource.Resource` this factory can create.
     """
 
-    def __init__(self, api_url, verify=True):
+    def __init__(
+            self,
+            api_url,
+            verify=True,
+            compile_fields=False,
+            page_size=None,
+            cache=None,
+            retry=None,
+            throttle=None,
+            breaker=None,
+            timeout=None,
+            hooks=None,
+            n_plus_one=None,
+            adapters=None,
+            transport=None,
+            compress_requests=None,
+    ):
         self._url = api_url
         self._dependencies = []
+        api_settings = {
+            'page_size': page_size,
+            'cache': cache,
+            'retry': retry,
+            'throttle': throttle,
+            'breaker': breaker,
+            'hooks': hooks,
+            'adapters': adapters,
+            'transport': transport,
+            'compress_requests': compress_requests,
+        }
 
-        api = TastyApi(api_url)
+        api = TastyApi(api_url, timeout=timeout, **api_settings)
         api.verify = verify
         self.resources = api.resources()
+        self._api_settings = api_settings
 
         self.__dict__.update({k: None for k in self.resources})
         self._auth = None
         self._auth_lock = Lock()
         self._verify = verify
+        self._timeout = timeout
+        self._compile_fields = compile_fields
+        self._n_plus_one = n_plus_one
+        self._local = local()
 
     def __getattribute__(self, name):
         if name not in ['resources', '_dependencies']:
@@ -76,6 +157,10 @@ class ResourceFactory(object):
                 'resource_name': resource,
                 'auth': self._auth,
                 'verify': self._verify,
+                'timeout': self._timeout,
+                'compile_fields': self._compile_fields,
+                '_api_settings': self._api_settings,
+                '_n_plus_one': self._n_plus_one,
                 '_factory': self,
             },
         )
@@ -101,6 +186,81 @@ class ResourceFactory(object):
         ),
     )
 
+    def _current_batch(self):
+        return getattr(self._local, 'batch', None)
+
+    @contextmanager
+    def batch(self, max_size=None):
+        """Queue saves, updates and deletes of existing Resources, and send
+        them in as few requests as possible.
+
+        Within the ``with`` block, calls to
+        :py:meth:`~tastytopping.resource.Resource.save`,
+        :py:meth:`~tastytopping.resource.Resource.update` and
+        :py:meth:`~tastytopping.resource.Resource.delete` on existing Resources
+        created by this factory are queued. When the block ends, the queued
+        changes are sent using a
+        :py:meth:`~tastytopping.resource.Resource.bulk` request per resource
+        type::
+
+            >>> with factory.batch():
+            ...     for entry in factory.entry.filter(user=user1):
+            ...         entry.title = entry.title.upper()
+            ...         entry.save()
+
+        Note that new Resources are still created immediately, so that they
+        have a URI. If an exception is raised in the block, the queued changes
+        are discarded, and the queued Resources go back to their saved values.
+        Batches only apply to the current thread, and nested batches are merged
+        into the outermost one.
+
+        :param max_size: The maximum number of resources to send per request,
+            or None for no limit.
+        :type max_size: int
+        :returns: The batch of queued changes.
+        :rtype: :py:class:`~tastytopping.batch.Batch`
+        """
+        current = self._current_batch()
+        if current is not None:
+            yield current
+            return
+        batch = Batch(max_size)
+        self._local.batch = batch
+        try:
+            yield batch
+        except BaseException:
+            batch.discard()
+            raise
+        finally:
+            self._local.batch = None
+        batch.flush()
+
+    @contextmanager
+    def profile(self):
+        """Add up the requests sent by the current thread inside the block.
+
+        This works like :py:meth:`~tastytopping.queryset.QuerySet.with_stats`,
+        but for everything in the block. Resources retrieved inside the block
+        keep adding the lazy loading of their fields to the stats, even after
+        the block has ended::
+
+            >>> with factory.profile() as stats:
+            ...     for entry in factory.entry.filter(rating__gt=3):
+            ...         print(entry.user.username)
+            >>> stats['user'].requests
+            20
+
+        Note that requests sent using other factories inside the block are
+        counted too, as are those sent by
+        :py:func:`~tastytopping.gather.gather`'s worker threads.
+
+        :returns: The stats.
+        :rtype: :py:class:`~tastytopping.stats.QueryStats`
+        """
+        stats = QueryStats()
+        with collecting(stats):
+            yield stats
+
     def add_factory_dependency(self, factory):
         """Add another ResourceFactory as a dependency.
 
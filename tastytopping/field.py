@@ -9,7 +9,7 @@
 """
 
 
-__all__ = ('create_field', )
+__all__ = ('create_field', 'field_decoder', )
 
 
 from datetime import datetime
@@ -117,6 +117,16 @@ class ResourceListField(Field):
             return field, []
 
 
+def _is_probably_resource(field):
+    return (
+        hasattr(field, 'split') or
+        hasattr(field, 'uri') or (
+            isinstance(field, dict) and
+            'resource_uri' in field
+        )
+    )
+
+
 class _FieldCreator(object):
 
     def __init__(self, field, field_type, factory):
@@ -127,13 +137,7 @@ class _FieldCreator(object):
     def _is_probably_resource(self, field=None):
         if field is None:
             field = self._field
-        return (
-            hasattr(field, 'split') or
-            hasattr(field, 'uri') or (
-                isinstance(field, dict) and
-                'resource_uri' in field
-            )
-        )
+        return _is_probably_resource(field)
 
     def _is_probably_datetime(self):
         return (
@@ -172,24 +176,7 @@ class _FieldCreator(object):
         return result
 
     def _create_known_field(self):
-        try:
-            if self._field_type == tastytypes.RELATED:
-                if self._is_probably_resource(self._field):
-                    result = ResourceField(self._field, self._factory)
-                else:
-                    result = ResourceListField(self._field, self._factory)
-            elif self._field_type == tastytypes.DATETIME:
-                result = DateTimeField(self._field)
-            else:
-                result = Field(self._field)
-        except Exception as error:
-            raise InvalidFieldValue(
-                error,
-                'Encountered "{0}" while creating a "{1}" Field with the value "{2}"'.format(
-                    error, self._field_type, self._field
-                )
-            )
-        return result
+        return field_decoder(self._field_type)(self._field, self._factory)
 
     def create(self):
         """Create a Field object based on the construction params."""
@@ -205,3 +192,48 @@ def create_field(field, field_type, factory):
 
     creator = _FieldCreator(field, field_type, factory)
     return creator.create()
+
+
+def _make_decoder(field_type):
+    if field_type is None:
+        return lambda value, factory: _FieldCreator(value, None, factory).create()
+    if field_type == tastytypes.RELATED:
+        def _create(value, factory):
+            if _is_probably_resource(value):
+                return ResourceField(value, factory)
+            return ResourceListField(value, factory)
+    elif field_type == tastytypes.DATETIME:
+        _create = lambda value, factory: DateTimeField(value)
+    else:
+        _create = lambda value, factory: Field(value)
+
+    def _decode(value, factory):
+        if value is None:
+            return Field(None)
+        try:
+            return _create(value, factory)
+        except Exception as error:
+            raise InvalidFieldValue(
+                error,
+                'Encountered "{0}" while creating a "{1}" Field with the value "{2}"'.format(
+                    error, field_type, value
+                )
+            )
+    return _decode
+
+
+_DECODERS = {}
+
+
+def field_decoder(field_type):
+    """Return a function creating the appropriate Field for the field_type.
+
+    The returned function takes (value, factory) and behaves like
+    :py:func:`create_field`, except that the choice of Field class is made once
+    up-front, instead of on every call.
+    """
+
+    try:
+        return _DECODERS[field_type]
+    except KeyError:
+        return _DECODERS.setdefault(field_type, _make_decoder(field_type))
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module: gather
+    :platform: Unix, Windows
+    :synopsis: Evaluate independent queries concurrently.
+
+.. moduleauthor:: Christian Boelsen <christian.boelsen@hds.com>
+"""
+
+
+__all__ = ('gather', )
+
+
+from collections import deque
+from contextlib import contextmanager
+from threading import Thread
+
+from . import stats
+from .deadline import deadline, remaining_time
+from .queryset import QuerySet
+
+
+def _as_callable(call):
+    if isinstance(call, QuerySet):
+        # Iterating over the whole QuerySet fills its result cache.
+        return lambda: list(call)
+    if not callable(call):
+        raise TypeError('gather() expects callables or QuerySets, not {0!r}'.format(call))
+    return call
+
+
+@contextmanager
+def _inherited(left, collectors):
+    """Give a worker thread the deadline and stats of the thread calling
+    gather()."""
+    with stats.joining(*collectors):
+        if left is None:
+            yield
+        else:
+            with deadline(left):
+                yield
+
+
+def gather(*calls, **kwargs):
+    """Evaluate each query concurrently, and return their results in order.
+
+    Each argument is either a :py:class:`~tastytopping.queryset.QuerySet`,
+    which is evaluated completely (filling its result cache), or a callable
+    taking no arguments (eg. ``query.count`` or ``lambda: query[:50]``). This
+    means the time taken is roughly that of the slowest query, rather than the
+    sum of all of them::
+
+        >>> num_entries, has_drafts, a_entries = gather(
+        ...     factory.entry.all().count,
+        ...     factory.entry.filter(draft=True).exists,
+        ...     factory.entry.filter(title__startswith='A'),
+        ... )
+
+    If any of the calls raise an exception, the first one (in argument order)
+    is raised once every call has finished. The same QuerySet shouldn't be
+    passed more than once, since QuerySets are not thread-safe. The calls
+    share the :py:func:`~tastytopping.deadline.deadline` of the calling
+    thread, and their requests are counted by any
+    :py:meth:`~tastytopping.ResourceFactory.profile` it's collecting into.
+
+    :param calls: The QuerySets and callables to evaluate.
+    :type calls: QuerySet or callable
+    :param max_workers: The maximum number of calls to evaluate at once, or
+        None to evaluate every call at once.
+    :type max_workers: int
+    :returns: The result of each call, in the order given.
+    :rtype: list
+    :raises: TypeError
+    """
+    max_workers = kwargs.pop('max_workers', None)
+    if kwargs:
+        raise TypeError('Unexpected keyword arguments for gather(): {0}'.format(', '.join(kwargs)))
+    calls = [_as_callable(call) for call in calls]
+    results = [None] * len(calls)
+    errors = [None] * len(calls)
+    pending = deque(range(len(calls)))
+    left = remaining_time()
+    collectors = stats.active()
+
+    def evaluate_pending():
+        with _inherited(left, collectors):
+            while True:
+                try:
+                    index = pending.popleft()
+                except IndexError:
+                    return
+                try:
+                    results[index] = calls[index]()
+                except Exception as err:
+                    errors[index] = err
+
+    threads = [Thread(target=evaluate_pending) for _ in range(min(max_workers or len(calls), len(calls)))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for error in errors:
+        if error is not None:
+            raise error
+    return results
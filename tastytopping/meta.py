@@ -16,7 +16,8 @@ from .nested import NestedResource
 
 
 class ResourceMeta(type):
-    """Updates the TastyApi.auth for the class and all instances."""
+    """Updates the TastyApi.auth and TastyApi.timeout for the class and all
+    instances."""
 
     _classes = []
 
@@ -25,11 +26,16 @@ class ResourceMeta(type):
             auth_value = classdict.pop('auth')
         except KeyError:
             auth_value = bases[0]._auth
+        try:
+            timeout_value = classdict.pop('timeout')
+        except KeyError:
+            timeout_value = bases[0]._timeout
         # Keep track classes to update auth in property.
         obj = super(ResourceMeta, mcs).__new__(mcs, name, bases, classdict)
         mcs._classes.append(obj)
         # Move the user provided auth to a protected member.
         obj._auth = auth_value
+        obj._timeout = timeout_value
         obj._class_api = None
         return obj
 
@@ -56,3 +62,19 @@ class ResourceMeta(type):
                     _set_api_auth(derived, auth)
 
     auth = property(_get_auth, _set_auth)
+
+    def _get_timeout(cls):
+        with cls._auth_lock:
+            return cls._timeout
+
+    def _set_timeout(cls, timeout):
+        with cls._auth_lock:
+            def _set_api_timeout(cls, timeout):
+                cls._timeout = timeout
+                cls._api().timeout = timeout
+            _set_api_timeout(cls, timeout)
+            for derived in ResourceMeta._classes:
+                if issubclass(derived, cls):
+                    _set_api_timeout(derived, timeout)
+
+    timeout = property(_get_timeout, _set_timeout)
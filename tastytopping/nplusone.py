@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module: nplusone
+    :platform: Unix, Windows
+    :synopsis: Find related resources being loaded one request at a time.
+
+.. moduleauthor:: Christian Boelsen <christian.boelsen@hds.com>
+"""
+
+
+__all__ = ('NPlusOneDetector', )
+
+
+import os
+import traceback
+import warnings
+
+from .exceptions import NPlusOneQueries, NPlusOneWarning
+from . import stats
+from .stats import QueryStats
+
+
+_PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _access_site():
+    """Return the innermost frame outside of this package, which is where the
+    lazily loaded field was accessed."""
+    for frame in reversed(traceback.extract_stack()):
+        if not os.path.abspath(frame[0]).startswith(_PACKAGE_DIR + os.sep):
+            return frame
+    return None
+
+
+class _Origin(QueryStats):
+    """The stats of a single evaluation of a QuerySet, reporting any type of
+    resource lazily loaded too many times."""
+
+    def __init__(self, detector, resource_name):
+        super(_Origin, self).__init__()
+        self._detector = detector
+        self._resource_name = resource_name
+
+    def record_lazy_load(self, resource_name):
+        super(_Origin, self).record_lazy_load(resource_name)
+        with self._lock:
+            loads = self._resources[resource_name].lazy_loads
+        if loads == self._detector.threshold:
+            self._detector.report(self._resource_name, resource_name, loads)
+
+
+class NPlusOneDetector(object):
+    """Find the "N+1 queries" problem: the resources returned by a QuerySet
+    each loading a related resource with a separate request, when they
+    could all have been retrieved together.
+
+    Each evaluation of a QuerySet (iterating over it, or slicing it) is
+    tracked separately, along with any related resources its results refer
+    to. When ``threshold`` resources of the same type have had their fields
+    loaded lazily, the detector warns (with a
+    :py:class:`~tastytopping.exceptions.NPlusOneWarning`), or raises
+    :py:class:`~tastytopping.exceptions.NPlusOneQueries`, pointing at the line
+    that accessed the field.
+
+    Pass an NPlusOneDetector to :py:class:`~tastytopping.ResourceFactory` to
+    use it for all of its resources. Raising is useful in tests, so that the
+    problem is found before it is slow in production::
+
+        >>> factory = ResourceFactory('http://localhost/app_name/api/v1/', n_plus_one=NPlusOneDetector(action='raise'))
+        >>> for entry in factory.entry.all():
+        ...     print(entry.user.username)
+        NPlusOneQueries: 2 "user" resources were loaded one request at a time ...
+
+    Note that counting happens before the request is sent, so responses
+    returned by the cache are counted too.
+
+    :param threshold: The number of lazily loaded resources of the same type
+        that counts as a problem.
+    :type threshold: int
+    :param action: Either NPlusOneDetector.WARN or NPlusOneDetector.RAISE.
+    :type action: str
+    """
+
+    WARN = 'warn'
+    RAISE = 'raise'
+
+    def __init__(self, threshold=2, action=WARN):
+        if action not in (self.WARN, self.RAISE):
+            raise ValueError('action must be "{0}" or "{1}", not "{2}"'.format(self.WARN, self.RAISE, action))
+        self.threshold = threshold
+        self.action = action
+        self._warnings_registry = {}
+
+    def origin(self, resource_name):
+        """Return the stats to collect a single evaluation of a QuerySet into.
+
+        :param resource_name: The name of the QuerySet's resource.
+        :type resource_name: str
+        :returns: The stats, which report lazy loads to this detector.
+        :rtype: :py:class:`~tastytopping.stats.QueryStats`
+        """
+        return _Origin(self, resource_name)
+
+    def tracking(self):
+        """Return whether an evaluation of a QuerySet is already being tracked
+        in the current thread (eg. when one QuerySet method calls another).
+
+        :returns: True if tracking.
+        :rtype: bool
+        """
+        return any(getattr(s, '_detector', None) is self for s in stats.active())
+
+    def report(self, queried, loaded, count):
+        """Warn or raise about a type of resource being lazily loaded.
+
+        :param queried: The name of the QuerySet's resource.
+        :type queried: str
+        :param loaded: The name of the lazily loaded resource.
+        :type loaded: str
+        :param count: The number of resources lazily loaded.
+        :type count: int
+        :raises: NPlusOneQueries
+        """
+        site = _access_site()
+        location = 'an unknown location' if site is None else '{0}:{1}'.format(site[0], site[1])
+        message = (
+            '{0} "{1}" resources were loaded one request at a time from the results of a "{2}" QuerySet, '
+            'at {3}. Use prefetch_related() on the QuerySet to retrieve them with the results, '
+            'or retrieve them together in a single filter() request.'
+        ).format(count, loaded, queried, location)
+        if self.action == self.RAISE:
+            raise NPlusOneQueries(message)
+        if site is None:
+            warnings.warn(message, NPlusOneWarning)
+        else:
+            warnings.warn_explicit(message, NPlusOneWarning, site[0], site[1], registry=self._warnings_registry)
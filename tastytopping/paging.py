@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module: paging
+    :platform: Unix, Windows
+    :synopsis: Choose how many resources to request per page.
+
+.. moduleauthor:: Christian Boelsen <christian.boelsen@hds.com>
+"""
+
+
+__all__ = ('AdaptivePageSize', )
+
+
+from .lock import PickleLock
+
+
+class AdaptivePageSize(object):
+    """Adapt the number of resources requested per page to how long each page
+    takes to retrieve, and how large each page is.
+
+    After each page, the size of the next page is scaled towards the target
+    time (and the target number of bytes, if given), without growing or
+    shrinking by more than the growth factor at a time. Page sizes are kept
+    separately for each resource, and never exceed the server's ``max_limit``
+    once it's been discovered.
+
+    Pass an AdaptivePageSize to :py:class:`~tastytopping.ResourceFactory` to
+    use it for all of its resources::
+
+        >>> factory = ResourceFactory(
+        ...     'http://localhost/app_name/api/v1/',
+        ...     page_size=AdaptivePageSize(target_time=0.5),
+        ... )
+
+    :param initial: The number of resources to request in the first page.
+    :type initial: int
+    :param minimum: The smallest number of resources to request per page.
+    :type minimum: int
+    :param maximum: The largest number of resources to request per page, or
+        None to only be limited by the server.
+    :type maximum: int
+    :param target_time: The time (in seconds) each page should take.
+    :type target_time: float
+    :param target_bytes: The size (in bytes) each page should be, or None to
+        only target the time.
+    :type target_bytes: int
+    :param growth: The largest factor by which the page size can change
+        between pages.
+    :type growth: float
+    """
+
+    def __init__(self, initial=100, minimum=10, maximum=None, target_time=1.0, target_bytes=None, growth=2.0):
+        self._initial = initial
+        self._minimum = minimum
+        self._maximum = maximum
+        self._target_time = target_time
+        self._target_bytes = target_bytes
+        self._growth = growth
+        self._limits = {}
+        self._server_limits = {}
+        self._lock = PickleLock()
+
+    def limit(self, url):
+        """Return the number of resources to request in the next page.
+
+        :param url: The URL of the resource's list endpoint.
+        :type url: str
+        :returns: The page size.
+        :rtype: int
+        """
+        with self._lock:
+            return self._limits.get(url, self._initial)
+
+    def record(self, url, requested, returned, elapsed, size, server_limit):
+        """Update the page size for the resource, given the last page retrieved.
+
+        :param url: The URL of the resource's list endpoint.
+        :type url: str
+        :param requested: The number of resources requested.
+        :type requested: int
+        :param returned: The number of resources returned.
+        :type returned: int
+        :param elapsed: The time taken to retrieve the page, in seconds.
+        :type elapsed: float
+        :param size: The size of the page, in bytes.
+        :type size: int
+        :param server_limit: The limit reported by the server for the page.
+        :type server_limit: int
+        """
+        with self._lock:
+            current = self._limits.get(url, self._initial)
+            if server_limit and server_limit < requested:
+                self._server_limits[url] = server_limit
+            elif returned < requested or requested < current:
+                # Smaller pages (eg. the last page) say little about the time per page.
+                return
+            if returned:
+                scale = self._target_time / elapsed if elapsed > 0 else self._growth
+                if self._target_bytes and size:
+                    scale = min(scale, float(self._target_bytes) / size)
+                scale = max(1.0 / self._growth, min(self._growth, scale))
+                current = int(min(current, returned) * scale)
+            current = max(self._minimum, current)
+            for maximum in (self._maximum, self._server_limits.get(url)):
+                if maximum:
+                    current = min(maximum, current)
+            self._limits[url] = current
@@ -13,6 +13,7 @@ __all__ = ('QuerySet', 'EmptyQuerySet', )
 
 
 import abc
+import functools
 
 
 from .exceptions import (
@@ -21,6 +22,7 @@ from .exceptions import (
     OrderByRequiredForReverse,
 )
 from .field import create_field
+from .stats import QueryStats, collecting
 
 
 try:
@@ -29,6 +31,115 @@ except AttributeError:
     abc.ABC = abc.ABCMeta('ABC', (object, ), {})    # For python < 3.4
 
 
+class _ResultCache(object):
+    """Cache windows of a query's results, keyed by their index in the query.
+
+    Adjacent and overlapping windows are merged, and the least recently used
+    windows are dropped once more than max_size results are cached.
+    """
+
+    def __init__(self):
+        self._windows = {}
+        self._last_used = {}
+        self._tick = 0
+
+    def __len__(self):
+        return sum(len(w) for w in self._windows.values())
+
+    def _use(self, start):
+        self._tick += 1
+        self._last_used[start] = self._tick
+
+    def _window_containing(self, index):
+        for start, window in self._windows.items():
+            if start <= index < start + len(window):
+                return start, window
+        return None, None
+
+    def cached(self, start, stop):
+        """Return the cached results at the start and the end of the range.
+
+        :returns: A (head, tail) tuple of lists: the cached results from start
+            onwards, and the cached results up to stop, not overlapping head.
+        :rtype: tuple
+        """
+        head_start, head = self._window_containing(start)
+        if head is None:
+            head = []
+        else:
+            self._use(head_start)
+            head = head[start - head_start:stop - head_start]
+        tail_start, tail = self._window_containing(stop - 1)
+        if tail is None or start + len(head) >= stop:
+            tail = []
+        else:
+            self._use(tail_start)
+            tail = tail[max(tail_start, start + len(head)) - tail_start:stop - tail_start]
+        return head, tail
+
+    def add(self, start, results, max_size):
+        """Cache the results found starting at the given index, keeping at
+        most max_size results cached."""
+        if not results or len(results) > max_size:
+            return
+        stop = start + len(results)
+        merged_start, merged = start, list(results)
+        for other_start, other in list(self._windows.items()):
+            other_stop = other_start + len(other)
+            if other_stop < start or other_start > stop:
+                continue
+            del self._windows[other_start]
+            del self._last_used[other_start]
+            # Newly retrieved results replace any overlapping cached results.
+            if other_start < merged_start:
+                merged = other[:merged_start - other_start] + merged
+                merged_start = other_start
+            if other_stop > merged_start + len(merged):
+                merged = merged + other[merged_start + len(merged) - other_start:]
+        self._windows[merged_start] = merged
+        self._use(merged_start)
+        while len(self) > max_size:
+            oldest = min(self._last_used, key=self._last_used.get)
+            del self._windows[oldest]
+            del self._last_used[oldest]
+
+
+def _collects_stats(method):
+    """Count the requests sent by the method towards the QuerySet's stats."""
+    @functools.wraps(method)
+    def _wrapper(self, *args, **kwargs):
+        collectors = self._collectors()
+        if not collectors:
+            return method(self, *args, **kwargs)
+        with collecting(*collectors):
+            return method(self, *args, **kwargs)
+    return _wrapper
+
+
+def _collects_stats_lazily(method):
+    """Like _collects_stats, for methods returning an iterator, so that only
+    the requests sent while iterating (and not those sent by the caller between
+    iterations) count towards the QuerySet's stats."""
+    @functools.wraps(method)
+    def _wrapper(self, *args, **kwargs):
+        iterator = method(self, *args, **kwargs)
+        collectors = self._collectors()
+        if not collectors:
+            return iterator
+        return _iterate_collecting(collectors, iterator)
+    return _wrapper
+
+
+def _iterate_collecting(collectors, iterator):
+    while True:
+        with collecting(*collectors):
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+        yield item
+
+
 class _AbstractQuerySet(abc.ABC):
 
     def __init__(self, resource, **kwargs):
@@ -38,6 +149,7 @@ class _AbstractQuerySet(abc.ABC):
         self._kwargs = kwargs
         self._reverse = kwargs.pop('__reverse', False)
         self._prefetch = kwargs.pop('__prefetch', [])
+        self._stats = kwargs.pop('__stats', None)
         self._ordering = kwargs.pop('order_by', [])
         if not isinstance(self._ordering, list):
             self._ordering = [self._ordering]
@@ -46,6 +158,10 @@ class _AbstractQuerySet(abc.ABC):
         self._val_retriever = None
         self._retrieved_resources = []
         self._prefetched_resources = {k: None for k in self._prefetch}
+        self._result_cache = _ResultCache()
+
+    result_cache_size = 10000
+    """(int) - The maximum number of Resources cached from indexing and slicing."""
 
     @abc.abstractmethod
     def __and__(self, other):
@@ -78,6 +194,8 @@ class _AbstractQuerySet(abc.ABC):
             new_kwargs['order_by'] = self._ordering + new_kwargs.get('order_by', [])
         if self._prefetch or '__prefetch' in new_kwargs:
             new_kwargs['__prefetch'] = self._prefetch + new_kwargs.get('__prefetch', [])
+        if self._stats is not None and '__stats' not in new_kwargs:
+            new_kwargs['__stats'] = self._stats
         return self._queryset_class()(self._resource, **new_kwargs)
 
     def all(self):
@@ -148,9 +266,14 @@ class _AbstractQuerySet(abc.ABC):
     def exists(self):
         """Returns whether this query matches any resources.
 
+        If the QuerySet has already been (even partially) evaluated, no
+        request is made to the API.
+
         :returns: True if any resources match, otherwise False.
         :rtype: bool
         """
+        if self._retrieved_resources:
+            return True
         return self.count() > 0
 
     @abc.abstractmethod
@@ -210,6 +333,43 @@ class _AbstractQuerySet(abc.ABC):
         except IndexError:
             return None
 
+    def with_stats(self, stats=None):
+        """Return a QuerySet that adds up the requests it causes.
+
+        This counts every request sent while evaluating the new QuerySet (or
+        any QuerySet derived from it), including pages, counts, prefetches,
+        and the lazy loading of the fields of Resources it returned (and of
+        their related Resources)::
+
+            query = factory.entry.filter(rating__gt=3).with_stats()
+            for entry in query:
+                print(entry.user.username)
+            print(query.stats.requests, query.stats['user'].requests)
+
+        :param stats: The stats to add to, so that several QuerySets can
+            share them, or None to create new stats.
+        :type stats: :py:class:`~tastytopping.stats.QueryStats`
+        :returns: A new QuerySet.
+        :rtype: QuerySet
+        """
+        return self.filter(__stats=stats or QueryStats())
+
+    def _collectors(self):
+        collectors = () if self._stats is None else (self._stats, )
+        detector = self._resource._n_plus_one
+        if detector is not None and not detector.tracking():
+            # Each evaluation is tracked separately, to find its results' lazy loads.
+            collectors += (detector.origin(self._resource._name()), )
+        return collectors
+
+    @property
+    def stats(self):
+        """(:py:class:`~tastytopping.stats.QueryStats`) - The requests this
+        QuerySet caused, or None if it wasn't created using
+        :py:meth:`~tastytopping.queryset.QuerySet.with_stats`.
+        """
+        return self._stats
+
     def prefetch_related(self, *args):
         """Returns a QuerySet that will automatically retrieve, in a single
         batch, related objects for each of the specified lookups.
@@ -240,6 +400,7 @@ class _AbstractQuerySet(abc.ABC):
         del state['_val_retriever']
         del state['_retrieved_resources']
         del state['_prefetched_resources']
+        del state['_result_cache']
         return state
 
     def __setstate__(self, state):
@@ -249,6 +410,7 @@ class _AbstractQuerySet(abc.ABC):
         self._val_retriever = None
         self._retrieved_resources = []
         self._prefetched_resources = {k: None for k in self._prefetch}
+        self._result_cache = _ResultCache()
 
 
 class QuerySet(_AbstractQuerySet):
@@ -306,6 +468,8 @@ class QuerySet(_AbstractQuerySet):
         if self._ordering or other._ordering:
             new_kwargs['order_by'] = self._ordering + other._ordering
         new_kwargs['__reverse'] = self._reverse
+        if self._stats is not None:
+            new_kwargs['__stats'] = self._stats
         for name, value in other._kwargs.items():
             if name in new_kwargs:
                 new_kwargs[name] = self._create_filter_list(new_kwargs[name], value)
@@ -313,8 +477,8 @@ class QuerySet(_AbstractQuerySet):
                 new_kwargs[name] = value
         return QuerySet(self._resource, **new_kwargs)
 
+    @_collects_stats
     def __getitem__(self, key):
-        # TODO Cache the results here too!
         if isinstance(key, slice):
             if key.start is None and key.stop is None:
                 return list(self)
@@ -337,6 +501,7 @@ class QuerySet(_AbstractQuerySet):
         else:
             raise TypeError("Invalid argument type.")
 
+    @_collects_stats_lazily
     def __iter__(self):
         for resource in self._retrieved_resources:
             resource = self._insert_prefetched_resources(resource)
@@ -423,14 +588,35 @@ class QuerySet(_AbstractQuerySet):
         self._count = total_count
         return all_resources
 
+    def _get_resources_from_api(self, start, limit):
+        objects = self._get_specified_resource_objects(start, limit)
+        resources = create_field(objects, None, self._resource._factory).value()
+        self._result_cache.add(start, resources, self.result_cache_size)
+        return resources
+
     def _get_specified_resources(self, start, stop, step=1):
         start, stop = self._convert_to_positive_indices(start, stop, step)
         available = len(self._retrieved_resources)
         if start < available and stop < available and stop != 0:
             return self._retrieved_resources[start:stop:step]
         limit = stop - start if stop > start else start - stop
-        objects = self._get_specified_resource_objects(start, limit)[::step]
-        return create_field(objects, None, self._resource._factory).value()
+        if limit == 0:
+            # The end of the range is unknown, so the cache can't be used.
+            return self._get_resources_from_api(start, limit)[::step]
+        stop = start + limit
+        if self._count is not None:
+            stop = min(stop, self._count)
+        # Only request the resources that aren't cached at either end of the range.
+        head, tail = self._result_cache.cached(start, stop)
+        missing_start = start + len(head)
+        missing_stop = stop - len(tail)
+        if missing_start >= missing_stop:
+            return (head + tail)[::step]
+        resources = self._get_resources_from_api(missing_start, missing_stop - missing_start)
+        if len(resources) < missing_stop - missing_start:
+            # The results ended before the range did, so any cached tail is stale.
+            tail = []
+        return (head + resources + tail)[::step]
 
     def _retriever(self):
         if self._val_retriever is None:
@@ -452,11 +638,16 @@ class QuerySet(_AbstractQuerySet):
                 raise OrderByRequiredForReverse(self._resource, self._kwargs)
             return kwargs
 
+    @_collects_stats
     def count(self):
         """Return the number of records for this resource.
 
-        :param kwargs: Keywors arguments to filter the search.
-        :type kwargs: dict
+        The count is cached, so only the first call (if the QuerySet hasn't
+        already been evaluated) will make a request to the API. That request
+        is ordered like the QuerySet, so that the single resource it returns
+        is cached as the first result (for
+        :py:meth:`~tastytopping.queryset.QuerySet.first` and indexing).
+
         :returns: The number of records for this resource.
         :rtype: int
         """
@@ -465,10 +656,20 @@ class QuerySet(_AbstractQuerySet):
             count_kwargs['limit'] = 1
             self._schema.check_list_request_allowed('get')
             count_kwargs = self._filter_fields(count_kwargs)
+            # Order the request, so that the object returned can be cached as the first result.
+            try:
+                count_kwargs = self._apply_order(count_kwargs)
+                first_cacheable = 'offset' not in count_kwargs
+            except OrderByRequiredForReverse:
+                first_cacheable = False
             response = self._api.get(self._resource._full_name(), **count_kwargs)
             self._count = response['meta']['total_count']
+            if first_cacheable:
+                first = create_field(response['objects'], None, self._resource._factory).value()
+                self._result_cache.add(0, first, self.result_cache_size)
         return self._count
 
+    @_collects_stats
     def update(self, **kwargs):
         """Updates all resources matching this query with the given fields.
 
@@ -487,6 +688,7 @@ class QuerySet(_AbstractQuerySet):
             resources.append(resource_fields)
         self._resource.bulk(create=resources)
 
+    @_collects_stats
     def delete(self):
         """Delete every Resource filtered by this query.
 
@@ -509,6 +711,7 @@ class QuerySet(_AbstractQuerySet):
             self._api.delete(self._resource._full_name())
             self._resource._alive = set()
 
+    @_collects_stats_lazily
     def iterator(self):
         """Returns an iterator to the QuerySet's results.
 
@@ -539,6 +742,54 @@ class QuerySet(_AbstractQuerySet):
                 yield self._resource(_fields=obj)
             self._count = response['meta']['total_count']
 
+    @_collects_stats_lazily
+    def iterate_by(self, key=None, chunk=1000):
+        """Returns an iterator to the QuerySet's results, using keyset
+        pagination.
+
+        Rather than paging through the results with an offset, which the
+        server gets slower at the deeper it goes, each request filters on the
+        key being greater than the last value seen (``key__gt=last_value``),
+        ordered by the key. This keeps the cost of each page constant, and
+        resources won't be skipped or repeated if others are created or deleted
+        during the iteration.
+
+        Like :py:meth:`~tastytopping.queryset.QuerySet.iterator`, no caching is
+        done at the QuerySet level. The QuerySet's own order is ignored, in
+        favour of the key's.
+
+        :param key: The field to order and page by, which needs to be unique,
+            orderable, and allow 'gt' (or 'lt', if prefixed with '-' for
+            descending order) filters. Defaults to
+            :py:meth:`~tastytopping.resource.Resource.filter_field`.
+        :type key: str
+        :param chunk: The number of resources to request per page.
+        :type chunk: int
+        :returns: An iterator to the QuerySet's results.
+        :rtype: iterator object
+        """
+        key = key or self._resource.filter_field()
+        field_name = key.lstrip('-')
+        key_filter = '{0}__{1}'.format(field_name, 'lt' if key.startswith('-') else 'gt')
+        self._schema.check_list_request_allowed('get')
+        self._schema.check_fields_in_filters(dict(self._kwargs, **{key_filter: None}))
+        fields = self._filter_fields(self._kwargs)
+        fields['order_by'] = [key]
+        remaining = fields.pop('limit', 0) or None
+        while True:
+            fields['limit'] = chunk if remaining is None else min(chunk, remaining)
+            response = self._api.get(self._resource._full_name(), **fields)
+            if self._count is None and key_filter not in fields:
+                self._count = response['meta']['total_count']
+            objects = response['objects']
+            for obj in objects:
+                yield self._insert_prefetched_resources(self._resource(_fields=obj))
+            if remaining is not None:
+                remaining -= len(objects)
+            if not objects or not response['meta']['next'] or remaining == 0:
+                break
+            fields[key_filter] = objects[-1][field_name]
+
     def _return_first_by_date(self, field_name):
         date_kwargs = self._kwargs.copy()
         date_kwargs['__reverse'] = self._reverse
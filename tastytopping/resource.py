@@ -13,9 +13,13 @@ __all__ = ('Resource', )
 
 
 import copy
+import time
 
 
 from .api import TastyApi
+from .descriptor import install_descriptors
+from .events import FieldsEvent
+from . import stats
 from .exceptions import (
     ResourceDeleted,
     CreatedResourceNotFound,
@@ -37,7 +41,7 @@ from .queryset import (
 
 # Required because the syntax for metaclasses changed between python 2 and 3.
 # TODO Remove this when python2 finally dies.
-BaseMetaBridge = ResourceMeta('_BaseMetaBridge', (object, ), {'auth': None})
+BaseMetaBridge = ResourceMeta('_BaseMetaBridge', (object, ), {'auth': None, 'timeout': None})
 
 
 class Resource(BaseMetaBridge, object):
@@ -72,10 +76,30 @@ class Resource(BaseMetaBridge, object):
     verify = True
     """(bool) - Sets whether the SSL certificate of the API should be verified."""
 
+    timeout = None
+    """(float or tuple) - The time (in seconds) to wait for the API when
+    sending requests for this resource, either as a single number or a
+    (connect, read) tuple. None means wait forever. Like the auth, changing
+    the timeout affects all instances of the Resource, as well as any derived
+    Resource classes.
+    """
+
+    compile_fields = False
+    """(bool) - Compile the schema into a data descriptor per field on this
+    class, the first time the schema is retrieved. This avoids looking up the
+    schema on every field access, at the cost of a bit of extra work up-front.
+    Set this on the class defining the resource_name; any classes derived from
+    it share its schema, and so its compiled fields.
+    """
+
     _factory = None
+    _field_descriptors = {}
+    _api_settings = {}
+    _n_plus_one = None
     _alive = set()
 
     _auth = None
+    _timeout = None
     _auth_lock = PickleLock()
     _class_api = None
     _class_api_lock = PickleLock()
@@ -95,6 +119,11 @@ class Resource(BaseMetaBridge, object):
         self._set('_resource_fields', fields)
         self._set('_cached_fields', {})
         self._set('_full_uri', None)
+        # The last known state of the fields on the server, used to find dirty fields.
+        remote_fields = kwargs.get('_fields')
+        self._set('_remote_fields', remote_fields if isinstance(remote_fields, dict) else {})
+        # Lazy loads count towards the stats of whatever retrieved this resource.
+        self._set('_stats', stats.active())
 
     def __str__(self):
         return '<"{0}": {1}>'.format(self.uri(), self.fields())
@@ -103,7 +132,12 @@ class Resource(BaseMetaBridge, object):
         return '<{0} {1} @ {2}>'.format(self._name(), self.uri(), id(self))
 
     def __setattr__(self, name, value):
-        if name not in self._fields():
+        descriptor = self._field_descriptors.get(name)
+        if descriptor is not None:
+            descriptor.__set__(self, value)
+            return
+        # Check the schema, rather than the fields, so that nothing is loaded.
+        if self._schema().field(name) is None and name not in (self._resource_fields or {}):
             super(Resource, self).__setattr__(name, value)
         self.check_alive()
         self.update(**{name: value, '___no_save': None})
@@ -153,9 +187,14 @@ class Resource(BaseMetaBridge, object):
     def _fields(self):
         if not self._resource_fields:
             self._schema().check_detail_request_allowed('get')
-            fields = self._api().get(self.full_uri())
-            fields = self._create_fields(**fields)
+            with stats.collecting(*self._stats):
+                stats.record_lazy_load(self._name())
+                remote_fields = self._api().get(self.full_uri())
+                fields = self._create_fields(**remote_fields)
+            # Fields assigned before loading haven't been saved yet.
+            fields.update(self._cached_fields)
             self._set('_resource_fields', fields)
+            self._set('_remote_fields', remote_fields)
         return self._resource_fields
 
     def _set_uri(self, uri):
@@ -179,13 +218,29 @@ class Resource(BaseMetaBridge, object):
 
     @classmethod
     def _create_fields(cls, **kwargs):
+        hooks = cls._api_settings.get('hooks')
+        collecting_stats = stats.active()
+        start = time.time()
         fields = {}
+        schema = cls._schema()
         for name, value in kwargs.items():
-            field_desc = cls._schema().field(name)
-            field_type = field_desc and field_desc['type']
-            fields[name] = create_field(value, field_type, cls._factory)
+            fields[name] = cls._create_field(name, value, schema)
+        if hooks is not None or collecting_stats:
+            event = FieldsEvent(cls._name(), len(fields), time.time() - start)
+            if hooks is not None:
+                hooks.fields(event)
+            stats.record_fields(event)
         return fields
 
+    @classmethod
+    def _create_field(cls, name, value, schema):
+        descriptor = cls._field_descriptors.get(name)
+        if descriptor is not None:
+            return descriptor.decode(value, cls._factory)
+        field_desc = schema.field(name)
+        field_type = field_desc and field_desc['type']
+        return create_field(value, field_type, cls._factory)
+
     @staticmethod
     def _stream_fields(fields):
         return {n: v.stream() for n, v in fields.items()}
@@ -229,10 +284,51 @@ class Resource(BaseMetaBridge, object):
             self._api().patch(self.full_uri(), **fields)
         except RestMethodNotAllowed:
             self._schema().check_detail_request_allowed('put')
+            # PUT needs every field, which are only retrieved if not yet loaded.
             current_fields = self._stream_fields(self._fields())
             current_fields.update(fields)
             self._api().put(self.full_uri(), **current_fields)
 
+    def _is_dirty(self, name, field):
+        if name not in self._remote_fields:
+            return True
+        # Compare the values rather than their JSON, which can differ for the
+        # same value (eg. datetimes, or related resources returned in full).
+        remote_field = self._create_field(name, self._remote_fields[name], self._schema())
+        try:
+            return remote_field.value() != field.value()
+        except ResourceHasNoUri:
+            return True
+
+    def _assign_fields(self, fields):
+        # Assigning never loads the fields; any that aren't loaded yet are
+        # merged with the assigned ones when they are.
+        if self._resource_fields or not self._uri:
+            self._resource_fields.update(fields)
+        for name, field in fields.items():
+            if self._is_dirty(name, field):
+                self._cached_fields[name] = field
+            else:
+                # Setting a field back to its remote value makes it clean again.
+                self._cached_fields.pop(name, None)
+
+    def _discard_changes(self):
+        if any(name not in self._remote_fields for name in self._cached_fields):
+            # There's no remote value to go back to, so get them all again.
+            self.refresh()
+            return
+        if self._resource_fields:
+            schema = self._schema()
+            for name in self._cached_fields:
+                self._resource_fields[name] = self._create_field(name, self._remote_fields[name], schema)
+        self._set('_cached_fields', {})
+
+    def _mark_saved(self):
+        remote_fields = dict(self._remote_fields)
+        remote_fields.update(self._stream_fields(self._cached_fields))
+        self._set('_remote_fields', remote_fields)
+        self._set('_cached_fields', {})
+
     def _set(self, name, value):
         #Avoiding python's normal __setattr__ behaviour to avoid infinite recursion.
         attr = '_Resource{0}'.format(name) if name.startswith('__') else name
@@ -245,18 +341,38 @@ class Resource(BaseMetaBridge, object):
                 if cls._class_api is None:
                     if cls.api_url is None:
                         raise NotImplementedError('"api_url" needs to be defined in a derived class.')
-                    cls._class_api = TastyApi(cls.api_url)
+                    cls._class_api = TastyApi(cls.api_url, **cls._api_settings)
                     if cls._auth:
                         cls._class_api.auth = cls._auth
+                    cls._class_api.timeout = cls._timeout
                     cls._class_api.verify = cls.verify
         return cls._class_api
 
+    @classmethod
+    def _batch(cls):
+        if cls._factory is None:
+            return None
+        return cls._factory._current_batch()
+
+    @classmethod
+    def _schema_owner(cls):
+        # The class defining the resource owns its schema (and compiled fields),
+        # so that every class derived from it shares them.
+        for klass in cls.__mro__:
+            if 'resource_name' in klass.__dict__ or 'api_url' in klass.__dict__:
+                return klass
+        return cls
+
     @classmethod
     def _schema(cls):
         if cls._class_schema is None:
-            with cls._class_schema_lock:
-                if cls._class_schema is None:
-                    cls._class_schema = cls._api().schema(cls._full_name())
+            owner = cls._schema_owner()
+            with owner._class_schema_lock:
+                if owner._class_schema is None:
+                    schema = owner._api().schema(owner._full_name())
+                    if owner.compile_fields:
+                        install_descriptors(owner, schema)
+                    owner._class_schema = schema
         return cls._class_schema
 
     @classmethod
@@ -317,9 +433,16 @@ class Resource(BaseMetaBridge, object):
         Note that any attempt to use this object after calling delete will
         result in an ResourceDeleted exception.
 
+        Within a :py:meth:`~tastytopping.ResourceFactory.batch`, the delete is
+        queued instead, and only sent when the batch ends.
+
         :raises: :py:class:`~tastytopping.exceptions.ResourceDeleted`
         """
         self.check_alive()
+        batch = self._batch()
+        if batch is not None:
+            batch.delete(self)
+            return
         self._schema().check_detail_request_allowed('delete')
         self._api().delete(self.full_uri())
         self._alive.remove(self.uri())
@@ -328,6 +451,7 @@ class Resource(BaseMetaBridge, object):
         """Retrieve the latest values from the API with the next member access."""
         self._set('_resource_fields', None)
         self._set('_cached_fields', {})
+        self._set('_remote_fields', {})
 
     def fields(self):
         """Return the fields according to the API.
@@ -349,30 +473,44 @@ class Resource(BaseMetaBridge, object):
         for field, value in kwargs.items():
             self._schema().validate(field, value)
         fields = self._create_fields(**kwargs)
-        self._fields().update(fields)
-        self._cached_fields.update(fields)
+        self._assign_fields(fields)
         if will_save:
             self.save()
 
     def save(self):
         """Saves a resource back to the API.
 
+        Within a :py:meth:`~tastytopping.ResourceFactory.batch`, saving an
+        existing resource is queued instead, and only sent when the batch ends.
+        New resources are always created immediately.
+
         :raises: :py:class:`~tastytopping.exceptions.ResourceDeleted`
         """
         try:
             # Attempt to update the resource.
             self.check_alive()
             self.full_uri()
+            batch = self._batch()
+            if batch is not None:
+                if self._cached_fields:
+                    batch.save(self)
+                return self
+            # Only the fields that differ from the remote state are sent, if any.
             if self._cached_fields:
                 self._update_remote_fields(**self._cached_fields)
-                self._set('_cached_fields', {})
+                self._mark_saved()
         except ResourceHasNoUri:
             # No uri was found, so the resource needs to be created.
             fields = self._stream_fields(self._resource_fields)
-            fields = self._create_new_resource(**fields)
-            self._set_uri(fields['resource_uri'])
-            fields = self._create_fields(**fields)
+            remote_fields = self._create_new_resource(**fields)
+            self._set_uri(remote_fields['resource_uri'])
+            if len(remote_fields) == 1:
+                # Only the URI is known, so GET the fields lazily, if they're needed.
+                remote_fields = {}
+            fields = self._create_fields(**remote_fields)
             self._set('_resource_fields', fields)
+            self._set('_cached_fields', {})
+            self._set('_remote_fields', remote_fields)
         return self
 
     @classmethod
@@ -463,7 +601,9 @@ class Resource(BaseMetaBridge, object):
 
         :param create: The dicts of fields for new resources.
         :type create: list
-        :param update: The Resource objects to update.
+        :param update: The Resource objects to update. Only the fields changed
+            since each was retrieved (or last saved) are sent, and those with
+            no changed fields are left out of the request altogether.
         :type update: list
         :param delete: The Resource objects to delete.
         :type delete: list
@@ -476,8 +616,10 @@ class Resource(BaseMetaBridge, object):
             resource.check_alive()
         # The resources to create or update are sent in a single list.
         resources = [cls._stream_fields(cls._create_fields(**res)) for res in create]
+        # Only send the dirty fields of updated resources, skipping those with no changes.
+        update = [r for r in update if r._cached_fields]
         for resource in update:
-            resource_fields = {n: v.stream() for n, v in resource._fields().items()}
+            resource_fields = cls._stream_fields(resource._cached_fields)
             resource_fields['resource_uri'] = resource.uri()
             resources.append(resource_fields)
         # Get the fields for any Resource objects given.
@@ -485,13 +627,16 @@ class Resource(BaseMetaBridge, object):
             [r for r in resources if not hasattr(r, 'uri')] +
             [r.fields() for r in resources if hasattr(r, 'uri')]
         )
-        cls._api().bulk(
-            cls._full_name(),
-            cls._schema(),
-            resources,
-            [d.uri() for d in delete]
-        )
-        # Mark each deleted resource as deleted.
+        if resources or delete:
+            cls._api().bulk(
+                cls._full_name(),
+                cls._schema(),
+                resources,
+                [d.uri() for d in delete]
+            )
+        # Mark each updated resource as saved, and each deleted resource as deleted.
+        for resource in update:
+            resource._mark_saved()
         for resource in delete:
             cls._alive.remove(resource.uri())
 
@@ -504,7 +649,10 @@ class Resource(BaseMetaBridge, object):
         state['factory_type'] = type(self._factory)
         class_state = self.__class__.__dict__.copy()
         class_state['auth'] = class_state.pop('_auth')
+        class_state['timeout'] = class_state.pop('_timeout')
         del class_state['_factory']
+        # The API settings are shared with the factory, which is recreated on unpickling.
+        class_state.pop('_api_settings', None)
         return (_unpickle, (self.__class__.__name__, class_state), state)
 
     def __setstate__(self, state):
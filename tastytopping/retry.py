@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module: retry
+    :platform: Unix, Windows
+    :synopsis: Decide when, and how long to wait before, retrying requests.
+
+.. moduleauthor:: Christian Boelsen <christian.boelsen@hds.com>
+"""
+
+
+__all__ = ('RetryPolicy', )
+
+
+from email.utils import parsedate_tz, mktime_tz
+import random
+import time
+
+from .lock import PickleLock
+
+
+def _retry_after(response):
+    header = response.headers.get('retry-after') if response is not None else None
+    if not header:
+        return None
+    try:
+        return max(0.0, float(header))
+    except ValueError:
+        parsed = parsedate_tz(header)
+        return max(0.0, mktime_tz(parsed) - time.time()) if parsed else None
+
+
+class RetryPolicy(object):
+    """Retry requests that failed because the API was (hopefully temporarily)
+    unavailable or overloaded.
+
+    Only requests using idempotent methods are retried after a connection
+    error or a retryable status, since the server may have acted on the
+    original request; the exception is 429 (Too Many Requests), which the
+    server rejected before doing anything. The delay before each retry grows
+    exponentially with random jitter, unless the server sent a
+    ``Retry-After`` header.
+
+    To avoid making an overloaded API worse, retries come out of a budget:
+    every request sent adds ``budget_ratio`` to the budget (up to
+    ``budget_size``), and every retry takes one away. Once the budget is
+    spent, failed requests are no longer retried until enough requests have
+    been sent to replenish it.
+
+    Pass a RetryPolicy to :py:class:`~tastytopping.ResourceFactory` to use it
+    for all of its resources::
+
+        >>> factory = ResourceFactory(
+        ...     'http://localhost/app_name/api/v1/',
+        ...     retry=RetryPolicy(max_retries=5),
+        ... )
+
+    :param max_retries: The maximum number of times to retry a request.
+    :type max_retries: int
+    :param backoff: The delay (in seconds) before the first retry, which is
+        doubled for every subsequent retry.
+    :type backoff: float
+    :param max_backoff: The longest delay (in seconds) before a retry,
+        including delays requested by the server.
+    :type max_backoff: float
+    :param statuses: The HTTP status codes to retry.
+    :type statuses: tuple
+    :param methods: The (idempotent) HTTP methods to retry.
+    :type methods: tuple
+    :param budget_ratio: The number of retries allowed per request sent.
+    :type budget_ratio: float
+    :param budget_size: The maximum number of retries that can be saved up.
+    :type budget_size: float
+    """
+
+    def __init__(
+            self,
+            max_retries=3,
+            backoff=0.5,
+            max_backoff=30.0,
+            statuses=(429, 502, 503, 504),
+            methods=('GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS'),
+            budget_ratio=0.2,
+            budget_size=10.0,
+    ):
+        self._max_retries = max_retries
+        self._backoff = backoff
+        self._max_backoff = max_backoff
+        self._statuses = statuses
+        self._methods = methods
+        self._budget_ratio = budget_ratio
+        self._budget_size = budget_size
+        self._budget = budget_size
+        self._lock = PickleLock()
+
+    @property
+    def budget(self):
+        """(float) - The number of retries currently allowed by the budget."""
+        with self._lock:
+            return self._budget
+
+    def record_request(self):
+        """Add a sent request's share to the retry budget."""
+        with self._lock:
+            self._budget = min(self._budget_size, self._budget + self._budget_ratio)
+
+    def _retryable(self, method, response):
+        if response is None:
+            return method in self._methods
+        if response.status_code not in self._statuses:
+            return False
+        return response.status_code == 429 or method in self._methods
+
+    def _spend_budget(self):
+        with self._lock:
+            if self._budget < 1:
+                return False
+            self._budget -= 1
+            return True
+
+    def delay(self, method, attempt, response=None):
+        """Return how long to wait before retrying a failed request, or None
+        if it shouldn't be retried.
+
+        :param method: The HTTP method of the request.
+        :type method: str
+        :param attempt: The number of times the request has been retried.
+        :type attempt: int
+        :param response: The failed response, or None if the request couldn't
+            connect.
+        :type response: requests.Response
+        :returns: The delay in seconds, or None.
+        :rtype: float
+        """
+        if attempt >= self._max_retries or not self._retryable(method.upper(), response):
+            return None
+        if not self._spend_budget():
+            return None
+        retry_after = _retry_after(response)
+        if retry_after is None:
+            # "Full jitter" spreads out the retries of many clients failing at once.
+            retry_after = random.uniform(0, self._backoff * 2 ** attempt)
+        return min(self._max_backoff, retry_after)
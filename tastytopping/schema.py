@@ -153,6 +153,14 @@ class TastySchema(object):
         """
         return self._fields().get(name)
 
+    def field_names(self):
+        """Return the names of all fields in the schema.
+
+        :returns: The field names.
+        :rtype: list
+        """
+        return list(self._fields().keys())
+
     def default(self, field):
         """Return the default value for this field."""
         field_desc = self.field(field)
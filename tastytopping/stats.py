@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module: stats
+    :platform: Unix, Windows
+    :synopsis: Add up the requests caused by QuerySets and blocks of code.
+
+.. moduleauthor:: Christian Boelsen <christian.boelsen@hds.com>
+"""
+
+
+__all__ = ('QueryStats', 'ResourceStats', 'collecting', )
+
+
+from contextlib import contextmanager
+from threading import local
+import time
+
+from .lock import PickleLock
+
+
+_LOCAL = local()
+
+
+class ResourceStats(object):
+    """The requests sent for a single type of resource.
+
+    :var requests: (int) - The number of requests sent to the API.
+    :var cached: (int) - The number of requests answered by the cache.
+    :var pages: (int) - The number of pages of resources retrieved.
+    :var objects: (int) - The number of resources retrieved.
+    :var lazy_loads: (int) - The number of resources whose fields were loaded
+        on first access, rather than being retrieved with the resource that
+        refers to them.
+    :var bytes_sent: (int) - The size of the requests' bodies.
+    :var bytes_received: (int) - The size of the responses' bodies.
+    :var request_time: (float) - The time (in seconds) spent on requests,
+        including decoding the responses.
+    :var fields_time: (float) - The time (in seconds) spent constructing the
+        resources' fields.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.cached = 0
+        self.pages = 0
+        self.objects = 0
+        self.lazy_loads = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.request_time = 0.0
+        self.fields_time = 0.0
+
+    def __repr__(self):
+        return '<ResourceStats requests={0} pages={1} objects={2} bytes={3} time={4:.3f}s>'.format(
+            self.requests,
+            self.pages,
+            self.objects,
+            self.bytes_sent + self.bytes_received,
+            self.request_time + self.fields_time,
+        )
+
+
+class QueryStats(object):
+    """The requests sent while evaluating a QuerySet (see
+    :py:meth:`~tastytopping.queryset.QuerySet.with_stats`), or inside a
+    :py:meth:`~tastytopping.ResourceFactory.profile` block, per type of
+    resource.
+
+    Resources retrieved while collecting remember the QueryStats, so that any
+    related resources they load later are counted too.
+
+    :var wall_time: (float) - The total time (in seconds) spent collecting.
+    """
+
+    def __init__(self):
+        self.wall_time = 0.0
+        self._resources = {}
+        self._lock = PickleLock()
+
+    def __getitem__(self, resource_name):
+        with self._lock:
+            return self._resources.get(resource_name, ResourceStats())
+
+    def __repr__(self):
+        return '<QueryStats requests={0} pages={1} objects={2} wall_time={3:.3f}s>'.format(
+            self.requests,
+            self.pages,
+            self.objects,
+            self.wall_time,
+        )
+
+    def _total(self, name):
+        with self._lock:
+            return sum(getattr(stats, name) for stats in self._resources.values())
+
+    @property
+    def resources(self):
+        """(dict) - The stats for each type of resource, as
+        {resource_name (str): stats (:py:class:`ResourceStats`)}."""
+        with self._lock:
+            return self._resources.copy()
+
+    @property
+    def requests(self):
+        """(int) - The number of requests sent to the API."""
+        return self._total('requests')
+
+    @property
+    def pages(self):
+        """(int) - The number of pages of resources retrieved."""
+        return self._total('pages')
+
+    @property
+    def objects(self):
+        """(int) - The number of resources retrieved."""
+        return self._total('objects')
+
+    @property
+    def bytes(self):
+        """(int) - The number of bytes sent and received."""
+        return self._total('bytes_sent') + self._total('bytes_received')
+
+    def _resource_stats(self, resource_name):
+        if resource_name not in self._resources:
+            self._resources[resource_name] = ResourceStats()
+        return self._resources[resource_name]
+
+    def record_request(self, event):
+        """Add a request to the stats.
+
+        :param event: The details of the request.
+        :type event: :py:class:`~tastytopping.events.RequestEvent`
+        """
+        with self._lock:
+            stats = self._resource_stats(event.resource_name)
+            if event.cached:
+                stats.cached += 1
+            else:
+                stats.requests += 1
+            if event.objects is not None:
+                stats.pages += 1
+                stats.objects += event.objects
+            elif event.method == 'GET' and event.status == 200 and event.url_template.endswith('{id}/'):
+                stats.objects += 1
+            stats.bytes_sent += event.bytes_sent
+            stats.bytes_received += event.bytes_received
+            stats.request_time += event.elapsed
+
+    def record_lazy_load(self, resource_name):
+        """Add the lazy loading of a resource's fields to the stats.
+
+        :param resource_name: The name of the resource.
+        :type resource_name: str
+        """
+        with self._lock:
+            self._resource_stats(resource_name).lazy_loads += 1
+
+    def record_fields(self, event):
+        """Add the construction of a resource's fields to the stats.
+
+        :param event: The details of the fields' construction.
+        :type event: :py:class:`~tastytopping.events.FieldsEvent`
+        """
+        with self._lock:
+            self._resource_stats(event.resource_name).fields_time += event.elapsed
+
+
+def active():
+    """Return the QueryStats collecting in the current thread.
+
+    :returns: The QueryStats.
+    :rtype: tuple
+    """
+    return getattr(_LOCAL, 'active', ())
+
+
+@contextmanager
+def collecting(*stats):
+    """A context manager adding every request sent by the current thread
+    inside it to each of the QueryStats.
+
+    :param stats: The QueryStats to collect into.
+    :type stats: QueryStats
+    """
+    previous = active()
+    # A QueryStats already collecting (eg. in a nested call) mustn't count twice.
+    new_stats = tuple(s for s in stats if not any(s is p for p in previous))
+    if not new_stats:
+        yield
+        return
+    _LOCAL.active = previous + new_stats
+    start = time.time()
+    try:
+        yield
+    finally:
+        _LOCAL.active = previous
+        elapsed = time.time() - start
+        for query_stats in new_stats:
+            with query_stats._lock:
+                query_stats.wall_time += elapsed
+
+
+@contextmanager
+def joining(*stats):
+    """A context manager adding every request sent by the current thread
+    inside it to each of the QueryStats, which are already collecting in
+    another thread.
+
+    Unlike :py:func:`collecting`, the time spent inside it isn't added to the
+    QueryStats' wall time, since the other thread is already counting it.
+
+    :param stats: The QueryStats to collect into.
+    :type stats: QueryStats
+    """
+    previous = active()
+    _LOCAL.active = previous + tuple(s for s in stats if not any(s is p for p in previous))
+    try:
+        yield
+    finally:
+        _LOCAL.active = previous
+
+
+def record_request(event):
+    """Add a request to every QueryStats collecting in the current thread.
+
+    :param event: The details of the request.
+    :type event: :py:class:`~tastytopping.events.RequestEvent`
+    """
+    for query_stats in active():
+        query_stats.record_request(event)
+
+
+def record_lazy_load(resource_name):
+    """Add the lazy loading of a resource's fields to every QueryStats
+    collecting in the current thread.
+
+    :param resource_name: The name of the resource.
+    :type resource_name: str
+    """
+    for query_stats in active():
+        query_stats.record_lazy_load(resource_name)
+
+
+def record_fields(event):
+    """Add a construction of fields to every QueryStats collecting in the
+    current thread.
+
+    :param event: The details of the fields' construction.
+    :type event: :py:class:`~tastytopping.events.FieldsEvent`
+    """
+    for query_stats in active():
+        query_stats.record_fields(event)
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module: throttle
+    :platform: Unix, Windows
+    :synopsis: Limit the rate and concurrency of requests sent to each host.
+
+.. moduleauthor:: Christian Boelsen <christian.boelsen@hds.com>
+"""
+
+
+__all__ = ('Throttle', )
+
+
+from contextlib import contextmanager
+from threading import Condition, Lock
+import time
+try:
+    from urllib.parse import urlparse
+except ImportError:     # For python < 3
+    from urlparse import urlparse
+
+from .deadline import remaining_time
+from .exceptions import DeadlineExceeded
+from .lock import PickleLock
+
+
+class _HostLimits(object):
+    """The token bucket and in-flight requests for a single host."""
+
+    def __init__(self, burst, max_concurrency):
+        self.tokens = burst
+        self.updated = time.time()
+        self.lock = Lock()
+        self.in_flight = 0
+        self.slot_freed = Condition(Lock())
+
+
+class Throttle(object):
+    """Limit the requests sent to each host, to avoid overwhelming an API that
+    is shared between many clients (or many threads of the same client).
+
+    The rate is limited using a token bucket: up to ``burst`` requests can be
+    sent at once, after which requests are sent at ``rate`` requests per
+    second. Separately, no more than ``max_concurrency`` requests are allowed
+    to be waiting for a response from the same host at any time. Inside a
+    :py:func:`~tastytopping.deadline.deadline`, requests don't wait for the
+    throttle past the time remaining.
+
+    Pass a Throttle to :py:class:`~tastytopping.ResourceFactory` to use it for
+    all of its resources. Sharing a Throttle between factories (or between
+    threads) shares the limits for each host::
+
+        >>> throttle = Throttle(rate=20, max_concurrency=4)
+        >>> factory = ResourceFactory('http://localhost/app_name/api/v1/', throttle=throttle)
+
+    :param rate: The maximum number of requests per second to send to each
+        host, or None to not limit the rate.
+    :type rate: float
+    :param burst: The maximum number of requests to send to a host at once
+        before the rate limit applies. Defaults to the rate (or 1, whichever
+        is larger).
+    :type burst: int
+    :param max_concurrency: The maximum number of requests in flight to each
+        host, or None to not limit the concurrency.
+    :type max_concurrency: int
+    """
+
+    def __init__(self, rate=None, burst=None, max_concurrency=None):
+        self._rate = rate
+        self._burst = burst or max(1, rate or 0)
+        self._max_concurrency = max_concurrency
+        self._hosts = {}
+        self._lock = PickleLock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # The hosts' locks can't be pickled, and their state is short-lived anyway.
+        state['_hosts'] = {}
+        return state
+
+    def _host_limits(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self._hosts:
+                self._hosts[host] = _HostLimits(self._burst, self._max_concurrency)
+            return self._hosts[host]
+
+    def _take_slot(self, limits, url, method):
+        with limits.slot_freed:
+            while limits.in_flight >= self._max_concurrency:
+                left = remaining_time()
+                if left is not None and left <= 0:
+                    raise DeadlineExceeded(url, method)
+                limits.slot_freed.wait(left)
+            limits.in_flight += 1
+
+    @staticmethod
+    def _release_slot(limits):
+        with limits.slot_freed:
+            limits.in_flight -= 1
+            limits.slot_freed.notify()
+
+    def _take_token(self, limits, url, method):
+        while True:
+            with limits.lock:
+                now = time.time()
+                limits.tokens = min(self._burst, limits.tokens + (now - limits.updated) * self._rate)
+                limits.updated = now
+                if limits.tokens >= 1:
+                    limits.tokens -= 1
+                    return
+                wait = (1 - limits.tokens) / self._rate
+            left = remaining_time()
+            if left is not None and wait >= left:
+                raise DeadlineExceeded(url, method)
+            time.sleep(wait)
+
+    @contextmanager
+    def request(self, url, method=None):
+        """A context manager that waits until a request can be sent to the
+        URL's host, and counts the request as in flight until it exits.
+
+        :param url: The URL the request will be sent to.
+        :type url: str
+        :param method: The request's method (only used in errors).
+        :type method: str
+        :raises: :py:class:`~tastytopping.exceptions.DeadlineExceeded`
+        """
+        limits = self._host_limits(url)
+        if self._max_concurrency:
+            self._take_slot(limits, url, method)
+        try:
+            # Only start the rate limit once there's a slot, so tokens aren't wasted waiting.
+            if self._rate:
+                self._take_token(limits, url, method)
+            yield
+        finally:
+            if self._max_concurrency:
+                self._release_slot(limits)
@@ -0,0 +1,371 @@
+# -*- coding: utf-8 -*-
+
+"""
+.. module: transport
+    :platform: Unix, Windows
+    :synopsis: Send HTTP requests to the API.
+
+.. moduleauthor:: Christian Boelsen <christian.boelsen@hds.com>
+"""
+
+
+__all__ = ('Transport', 'RequestsTransport', 'WsgiTransport', 'Http2Transport', )
+
+
+import abc
+from datetime import timedelta
+from io import BytesIO
+import sys
+from threading import Lock
+import time
+try:
+    from urllib.parse import urlsplit, unquote_to_bytes
+except ImportError:     # For python < 3
+    from urlparse import urlsplit
+    from urllib import unquote as unquote_to_bytes
+
+import requests
+from requests.cookies import MockRequest, MockResponse, RequestsCookieJar
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+try:
+    import httpx
+except ImportError:     # httpx is optional, and only needed for HTTP/2.
+    httpx = None
+
+
+try:
+    abc.ABC
+except AttributeError:
+    abc.ABC = abc.ABCMeta('ABC', (object, ), {})    # For python < 3.4
+
+
+class Transport(abc.ABC):
+    """The interface used to send requests to the API.
+
+    A transport returns responses compatible with ``requests.Response`` (with
+    at least ``status_code``, ``headers``, ``content``, ``elapsed``, ``url``
+    and ``raise_for_status()``), and raises the exceptions in
+    ``requests.exceptions`` when a request can't be sent. That way, the rest
+    of TastyTopping doesn't need to know which HTTP client is in use.
+
+    Each :py:class:`~tastytopping.resource.Resource` class uses its own
+    transport, so that it can keep its own cookies. To use a different
+    transport, pass a callable creating one (like the class itself) to
+    :py:class:`~tastytopping.ResourceFactory`::
+
+        >>> factory = ResourceFactory('http://localhost/app_name/api/v1/', transport=MyTransport)
+
+    Besides the default :py:class:`RequestsTransport`, there's a
+    :py:class:`WsgiTransport` to call an application in the same process, and
+    an :py:class:`Http2Transport` to multiplex requests over HTTP/2.
+    """
+
+    @abc.abstractmethod
+    def request(self, method, url, params=None, data=None, headers=None, auth=None, verify=True, timeout=None):
+        """Send a request, and return the response.
+
+        :param method: The HTTP method.
+        :type method: str
+        :param url: The URL, without the query string.
+        :type url: str
+        :param params: The query string's parameters.
+        :type params: dict
+        :param data: The request's body.
+        :type data: str
+        :param headers: The request's headers.
+        :type headers: dict
+        :param auth: The authentication to apply to the request, as used by
+            requests (ie. a callable taking and returning a
+            ``requests.PreparedRequest``).
+        :type auth: :py:class:`~tastytopping.auth.AuthBase`
+        :param verify: Whether to verify the server's SSL certificate.
+        :type verify: bool
+        :param timeout: The time (in seconds) to wait for the server, either as
+            a single number or a (connect, read) tuple, or None to wait forever.
+        :type timeout: float or tuple
+        :returns: The response.
+        :rtype: requests.Response
+        :raises: requests.exceptions.RequestException
+        """
+        raise NotImplementedError()
+
+    @abc.abstractproperty
+    def cookies(self):
+        """(CookieJar) - The cookies the server has set."""
+        raise NotImplementedError()
+
+    def close(self):
+        """Release any connections held by the transport."""
+        pass
+
+
+class RequestsTransport(Transport):
+    """The default transport, sending requests with a ``requests.Session``.
+
+    :param adapters: The requests transport adapters to send requests with, as
+        {url_prefix (str): adapter (requests.adapters.BaseAdapter)}, or None
+        to use the default adapters.
+    :type adapters: dict
+    """
+
+    def __init__(self, adapters=None):
+        self.session = requests.session()
+        for prefix, adapter in (adapters or {}).items():
+            self.mount(prefix, adapter)
+
+    def mount(self, prefix, adapter):
+        """Send requests to URLs starting with the prefix using the adapter.
+
+        :param prefix: The start of the URLs.
+        :type prefix: str
+        :param adapter: The requests transport adapter.
+        :type adapter: requests.adapters.BaseAdapter
+        """
+        self.session.mount(prefix, adapter)
+
+    def request(self, method, url, params=None, data=None, headers=None, auth=None, verify=True, timeout=None):
+        return self.session.request(
+            method,
+            url,
+            params=params,
+            data=data,
+            headers=headers,
+            auth=auth,
+            verify=verify,
+            timeout=timeout,
+        )
+
+    @property
+    def cookies(self):
+        return self.session.cookies
+
+    def close(self):
+        self.session.close()
+
+
+class _HeaderList(object):
+    """The headers of a WSGI response, as the cookie jar expects to see them."""
+
+    def __init__(self, headers):
+        self._headers = headers
+
+    def get_all(self, name, default=None):
+        values = [v for k, v in self._headers if k.lower() == name.lower()]
+        return values or default
+
+    def getheaders(self, name):     # For python < 3
+        return self.get_all(name, [])
+
+
+def _prepare(method, url, params, data, headers, auth, cookies):
+    """Return the request prepared by requests, with the cookies and auth
+    applied, for transports that send requests some other way."""
+    request = requests.Request(method, url, params=params, data=data, headers=headers, cookies=cookies).prepare()
+    if auth is not None:
+        request = auth(request)
+    return request
+
+
+def _body(request):
+    body = request.body or b''
+    if not isinstance(body, bytes):
+        body = body.encode('utf-8')
+    return body
+
+
+def _response(request, status_code, reason, headers, content, elapsed, cookies):
+    """Return a requests.Response for a response received some other way,
+    and keep any cookies it sets.
+
+    :param headers: The response's headers, as a list of (name, value).
+    """
+    response = requests.Response()
+    response.status_code = status_code
+    response.reason = reason
+    response.headers = CaseInsensitiveDict()
+    for name, value in headers:
+        if name in response.headers:
+            value = response.headers[name] + ', ' + value
+        response.headers[name] = value
+    response.encoding = get_encoding_from_headers(response.headers)
+    response._content = content
+    response.url = request.url
+    response.request = request
+    response.elapsed = timedelta(seconds=elapsed)
+    cookies.extract_cookies(MockResponse(_HeaderList(headers)), MockRequest(request))
+    return response
+
+
+def _native_string(value):
+    """Return the bytes as a native string, as WSGI expects."""
+    return value if isinstance(value, str) else value.decode('latin-1')
+
+
+class WsgiTransport(Transport):
+    """Send requests straight into a WSGI application in the same process,
+    such as a Django project serving the API, rather than over the network.
+
+    This skips the sockets, HTTP parsing and TLS that are otherwise needed to
+    talk to an API running in the same process (or container)::
+
+        >>> from functools import partial
+        >>> from mysite.wsgi import application
+        >>> factory = ResourceFactory('http://localhost/app_name/api/v1/', transport=partial(WsgiTransport, application))
+
+    The host in the API's URL is only used to fill in the environ. Cookies are
+    kept, and authentication is applied, just as with requests. As there's no
+    network to wait for, timeouts are ignored, and so is SSL verification, and
+    responses aren't compressed.
+
+    :param application: The WSGI application.
+    :type application: callable
+    """
+
+    def __init__(self, application):
+        self.application = application
+        self._cookies = RequestsCookieJar()
+
+    @staticmethod
+    def _environ(request):
+        parts = urlsplit(request.url)
+        body = _body(request)
+        https = parts.scheme == 'https'
+        environ = {
+            'REQUEST_METHOD': request.method,
+            'SCRIPT_NAME': '',
+            'PATH_INFO': _native_string(unquote_to_bytes(parts.path)),
+            'QUERY_STRING': parts.query,
+            'SERVER_NAME': parts.hostname or 'localhost',
+            'SERVER_PORT': str(parts.port or (443 if https else 80)),
+            'SERVER_PROTOCOL': 'HTTP/1.1',
+            'REMOTE_ADDR': '127.0.0.1',
+            'HTTP_HOST': parts.netloc,
+            'CONTENT_LENGTH': str(len(body)),
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': parts.scheme,
+            'wsgi.input': BytesIO(body),
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': False,
+            'wsgi.run_once': False,
+        }
+        for name, value in request.headers.items():
+            key = name.upper().replace('-', '_')
+            if key not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+                key = 'HTTP_' + key
+            environ[key] = value
+        return environ
+
+    def request(self, method, url, params=None, data=None, headers=None, auth=None, verify=True, timeout=None):
+        # Compressing the response would only cost time, with no network to save.
+        headers = {k: v for k, v in (headers or {}).items() if k.lower() != 'accept-encoding'}
+        request = _prepare(method, url, params, data, headers, auth, self._cookies)
+        start = time.time()
+        started = {}
+
+        def _start_response(status, response_headers, exc_info=None):
+            started['status'] = status
+            started['headers'] = response_headers
+
+        result = self.application(self._environ(request), _start_response)
+        try:
+            content = b''.join(result)
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+
+        status_code, _, reason = started['status'].partition(' ')
+        return _response(
+            request,
+            int(status_code),
+            reason,
+            started['headers'],
+            content,
+            time.time() - start,
+            self._cookies,
+        )
+
+    @property
+    def cookies(self):
+        return self._cookies
+
+
+class Http2Transport(Transport):
+    """Send requests with `httpx <https://www.python-httpx.org/>`_, which
+    speaks HTTP/2 to servers that support it (over HTTPS).
+
+    With HTTP/2, concurrent requests to the same host (eg. from
+    :py:func:`~tastytopping.gather.gather`, or several threads) are
+    multiplexed over a single connection, instead of each needing a
+    connection (and TLS handshake) of its own. All Http2Transports share their
+    connections, though each keeps its own cookies::
+
+        >>> factory = ResourceFactory('https://localhost/app_name/api/v1/', transport=Http2Transport)
+
+    This needs httpx's HTTP/2 support to be installed (``pip install
+    httpx[http2]``). Servers that don't support HTTP/2 are sent HTTP/1.1
+    requests instead.
+
+    :param client: The httpx.Client to send requests with, or None to share
+        one with every other Http2Transport.
+    :type client: httpx.Client
+    :raises: ImportError
+    """
+
+    _clients = {}
+    _clients_lock = Lock()
+
+    def __init__(self, client=None):
+        if httpx is None:
+            raise ImportError('Http2Transport needs httpx to be installed: pip install httpx[http2]')
+        self.client = client
+        self._cookies = RequestsCookieJar()
+
+    def _client(self, verify):
+        if self.client is not None:
+            return self.client
+        with self._clients_lock:
+            if verify not in self._clients:
+                self._clients[verify] = httpx.Client(http2=True, verify=verify)
+            return self._clients[verify]
+
+    @staticmethod
+    def _timeout(timeout):
+        try:
+            connect, read = timeout
+        except TypeError:
+            connect = read = timeout
+        return httpx.Timeout(read, connect=connect)
+
+    def request(self, method, url, params=None, data=None, headers=None, auth=None, verify=True, timeout=None):
+        request = _prepare(method, url, params, data, headers, auth, self._cookies)
+        start = time.time()
+        try:
+            response = self._client(verify).request(
+                request.method,
+                request.url,
+                headers=dict(request.headers),
+                content=_body(request),
+                timeout=self._timeout(timeout),
+            )
+        # Raise the same exceptions as requests, which the rest of TastyTopping expects.
+        except httpx.ConnectTimeout as err:
+            raise requests.exceptions.ConnectTimeout(err, request=request)
+        except httpx.TimeoutException as err:
+            raise requests.exceptions.ReadTimeout(err, request=request)
+        except httpx.TransportError as err:
+            raise requests.exceptions.ConnectionError(err, request=request)
+        return _response(
+            request,
+            response.status_code,
+            response.reason_phrase,
+            response.headers.multi_items(),
+            response.content,
+            time.time() - start,
+            self._cookies,
+        )
+
+    @property
+    def cookies(self):
+        return self._cookies
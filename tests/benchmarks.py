@@ -0,0 +1,265 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# pylint: skip-file
+
+"""Benchmarks against the test site, writing the results as JSON.
+
+Run from the top of the repository::
+
+    python -m tests.benchmarks --sizes 100 1000 --output results.json
+    # And after making changes:
+    python -m tests.benchmarks --sizes 100 1000 --output new.json --compare results.json
+"""
+
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+# The test site is started (from its own directory) when tests_base is imported.
+_START_DIR = os.getcwd()
+
+from tastytopping import *
+
+from .tests_base import *
+
+
+ContainerResource = FACTORY.container
+
+# Gzips every request's body, to compare the bytes sent against the CPU spent.
+COMPRESSED_FACTORY = ResourceFactory('http://localhost:8111/test/api/v1/', compress_requests=0)
+
+BENCHMARKS = []
+
+
+def benchmark(function):
+    """Add the function to the benchmarks run, in the order they're defined."""
+    BENCHMARKS.append(function)
+    return function
+
+
+class Samples(object):
+    """The time taken by each operation of a benchmark."""
+
+    def __init__(self):
+        self.times = []
+        self.objects = 0
+        self.bytes_sent = 0
+
+    def measure(self, function, objects=1):
+        start = time.time()
+        result = function()
+        self.times.append(time.time() - start)
+        self.objects += objects
+        return result
+
+    def summary(self):
+        times = sorted(self.times)
+        total = sum(times)
+        return {
+            'operations': len(times),
+            'objects': self.objects,
+            'bytes_sent': self.bytes_sent,
+            'total_time': total,
+            'operations_per_second': len(times) / total if total else None,
+            'objects_per_second': self.objects / total if total else None,
+            'latency': {
+                'min': times[0],
+                'mean': total / len(times),
+                'median': times[len(times) // 2],
+                'p95': times[min(len(times) - 1, int(len(times) * 0.95))],
+                'max': times[-1],
+            },
+        }
+
+
+def _path(size, i):
+    return u'bench{0}-{1}'.format(size, i)
+
+
+def _ops(size, options):
+    return min(size, options.operations)
+
+
+def _delete_all():
+    TestResource.all().delete()
+    ContainerResource.all().delete()
+    trees = list(TestTreeResource.all())
+    if trees:
+        TestTreeResource.bulk(delete=trees)
+
+
+def seed(size):
+    """Replace everything in the test site with size rows of each resource."""
+    _delete_all()
+    for start in range(0, size, 1000):
+        stop = min(size, start + 1000)
+        TestResource.create([
+            {'path': _path(size, i), 'rating': i % 100, 'title': 'title {0}'.format(i), 'text': 'text ' * 20}
+            for i in range(start, stop)
+        ])
+        TestTreeResource.create([{'name': _path(size, i)} for i in range(start, stop)])
+    tests = list(TestResource.all().order_by('id'))
+    for start in range(0, size, 1000):
+        ContainerResource.create([{'test': test} for test in tests[start:start + 1000]])
+
+
+@benchmark
+def get(size, samples, options):
+    for i in range(_ops(size, options)):
+        path = _path(size, i * size // _ops(size, options))
+        samples.measure(lambda: TestResource.get(path=path))
+
+
+@benchmark
+def create(size, samples, options):
+    for i in range(_ops(size, options)):
+        path = u'new-' + _path(size, i)
+        samples.measure(lambda: TestResource(path=path, rating=i % 100).save())
+
+
+@benchmark
+def save(size, samples, options):
+    resources = TestResource.all().order_by('id')[0:_ops(size, options)]
+    for i, resource in enumerate(resources):
+        resource.title = 'saved {0}'.format(i)
+        samples.measure(resource.save)
+
+
+def _bulk(factory, prefix, size, samples, options):
+    resource = factory.test_resource
+    resource.auth = TestResource.auth
+    for repeat in range(options.repeat):
+        fields = [{'path': u'{0}{1}-'.format(prefix, repeat) + _path(size, i)} for i in range(size)]
+        with factory.profile() as stats:
+            samples.measure(lambda: resource.create(fields), objects=size)
+        samples.bytes_sent += stats['test_resource'].bytes_sent
+
+
+@benchmark
+def bulk(size, samples, options):
+    _bulk(FACTORY, 'bulk', size, samples, options)
+
+
+@benchmark
+def compressed_bulk(size, samples, options):
+    _bulk(COMPRESSED_FACTORY, 'gzbulk', size, samples, options)
+
+
+@benchmark
+def iterate(size, samples, options):
+    for _ in range(options.repeat):
+        samples.measure(lambda: list(TestResource.filter(path__startswith=_path(size, ''))), objects=size)
+
+
+@benchmark
+def slicing(size, samples, options):
+    count = min(20, size)
+    for i in range(_ops(size, options)):
+        start = i * (size - count) // _ops(size, options)
+        samples.measure(lambda: TestResource.all().order_by('id')[start:start + count], objects=count)
+
+
+@benchmark
+def prefetch_related(size, samples, options):
+    def _related_paths():
+        return [container.test.path for container in ContainerResource.all().prefetch_related('test')]
+    for _ in range(options.repeat):
+        samples.measure(_related_paths, objects=size)
+
+
+@benchmark
+def nested(size, samples, options):
+    tree = TestTreeResource.get(name=_path(size, 0))
+    for _ in range(_ops(size, options)):
+        samples.measure(tree.nested.depth.get)
+
+
+def _commit():
+    try:
+        output = subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=os.path.dirname(os.path.abspath(__file__)))
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.decode('utf-8').strip()
+
+
+def _versions():
+    versions = {}
+    for package in ('requests', 'django', 'tastypie'):
+        try:
+            versions[package] = getattr(__import__(package), '__version__', None)
+        except ImportError:
+            versions[package] = None
+    return versions
+
+
+def run(options):
+    TestResource.auth = HTTPApiKeyAuth(TestsBase.TEST_USERNAME, TestsBase.TEST_API_KEY)
+    results = []
+    names = options.benchmarks or [b.__name__ for b in BENCHMARKS]
+    for size in options.sizes:
+        for function in BENCHMARKS:
+            if function.__name__ not in names:
+                continue
+            seed(size)
+            samples = Samples()
+            function(size, samples, options)
+            result = {'benchmark': function.__name__, 'size': size}
+            result.update(samples.summary())
+            results.append(result)
+            print('{0:>18} {1:>8}: {2:>10.1f} ops/s, {3:>10.1f} objects/s, median {4:.4f}s, {5} bytes sent'.format(
+                function.__name__,
+                size,
+                result['operations_per_second'] or 0,
+                result['objects_per_second'] or 0,
+                result['latency']['median'],
+                result['bytes_sent'],
+            ))
+    _delete_all()
+    return {
+        'commit': _commit(),
+        'timestamp': time.time(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'versions': _versions(),
+        'results': results,
+    }
+
+
+def compare(old, new):
+    """Print how much each benchmark's median latency changed."""
+    old_results = {(r['benchmark'], r['size']): r for r in old['results']}
+    print('\nMedian latency compared to {0}:'.format(old.get('commit')))
+    for result in new['results']:
+        previous = old_results.get((result['benchmark'], result['size']))
+        if previous is None:
+            continue
+        change = result['latency']['median'] / previous['latency']['median'] - 1
+        print('{0:>18} {1:>8}: {2:+.1%}'.format(result['benchmark'], result['size'], change))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark tastytopping against the test site.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000], help='The numbers of rows to seed.')
+    parser.add_argument('--benchmarks', nargs='+', choices=[b.__name__ for b in BENCHMARKS], help='The benchmarks to run.')
+    parser.add_argument('--operations', type=int, default=50, help='The maximum operations per benchmark.')
+    parser.add_argument('--repeat', type=int, default=3, help='The repeats of whole-table benchmarks.')
+    parser.add_argument('--output', help='The file to write the JSON results to.')
+    parser.add_argument('--compare', help='A previous JSON results file to compare against.')
+    options = parser.parse_args(argv)
+
+    results = run(options)
+    if options.output:
+        with open(os.path.join(_START_DIR, options.output), 'w') as output:
+            json.dump(results, output, indent=2, sort_keys=True)
+    if options.compare:
+        with open(os.path.join(_START_DIR, options.compare)) as previous:
+            compare(json.load(previous), results)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,229 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# pylint: skip-file
+
+"""Benchmarks of the client's own (pure python) costs, with every request
+answered from memory by a ReplayAdapter, so that no server is needed.
+
+The benchmarks follow asv's conventions (classes with params, a setup method,
+time_* methods, and track_* methods returning a value such as a size), and can
+also be run directly::
+
+    python -m tests.microbenchmarks
+    python -m tests.microbenchmarks --match DateTime --sizes 10000 --output results.json
+    # To see where the time goes in a single benchmark:
+    python -m tests.microbenchmarks --match FieldCreation.time_related --sizes 100000 --profile
+    # The bytes sent against the CPU spent compressing bulk requests:
+    python -m tests.microbenchmarks --match Compression
+"""
+
+
+import argparse
+import cProfile
+import inspect
+import json
+import pstats
+import sys
+import time
+import zlib
+
+from tastytopping.api import TastyApi
+from tastytopping.field import create_field, DateTimeField
+
+from .replay import canned_api, replay_factory, REPLAY_ADDRESS
+
+
+class FieldCreation(object):
+    params = [10000, 100000, 1000000]
+    param_names = ['fields']
+
+    def setup(self, n):
+        self.factory = replay_factory(canned_api(10))
+        self.factory.entry._schema()
+        self.strings = ['title {0}'.format(i) for i in range(n)]
+        self.datetimes = ['2014-05-01T12:00:{0:02d}.{1:06d}'.format(i % 60, i % 1000000) for i in range(n)]
+        self.uris = ['/api/v1/user/{0}/'.format(i % 10 + 1) for i in range(n)]
+
+    def time_string(self, n):
+        for value in self.strings:
+            create_field(value, 'string', self.factory)
+
+    def time_datetime(self, n):
+        for value in self.datetimes:
+            create_field(value, 'datetime', self.factory)
+
+    def time_related(self, n):
+        for value in self.uris:
+            create_field(value, 'related', self.factory)
+
+    def time_guessed_type(self, n):
+        for value in self.datetimes:
+            create_field(value, None, self.factory)
+
+
+class DateTimeParsing(object):
+    params = [10000, 100000, 1000000]
+    param_names = ['values']
+
+    def setup(self, n):
+        self.with_microseconds = ['2014-05-01T12:00:{0:02d}.{1:06d}'.format(i % 60, i) for i in range(n)]
+        self.without_microseconds = ['2014-05-01T12:{0:02d}:{1:02d}'.format(i % 60, i % 60) for i in range(n)]
+
+    def time_with_microseconds(self, n):
+        for value in self.with_microseconds:
+            DateTimeField(value)
+
+    def time_without_microseconds(self, n):
+        for value in self.without_microseconds:
+            DateTimeField(value)
+
+
+class FullUri(object):
+    params = [10000, 100000, 1000000]
+    param_names = ['uris']
+
+    def setup(self, n):
+        self.api = replay_factory(canned_api(10)).entry._api()
+        self.uris = ['/api/v1/entry/{0}/'.format(i) for i in range(n)]
+
+    def time_create_full_uri(self, n):
+        for uri in self.uris:
+            self.api.create_full_uri(uri)
+
+
+class ResourceConstruction(object):
+    params = [10000, 100000]
+    param_names = ['resources']
+
+    def setup(self, n):
+        self.factory = replay_factory(canned_api(10))
+        self.factory.entry._schema()
+        self.rows = self._rows(n)
+
+    @staticmethod
+    def _rows(n):
+        return [
+            {
+                'id': i,
+                'title': 'Entry number {0}'.format(i),
+                'rating': i % 100,
+                'created': '2014-05-01T12:00:{0:02d}.{1:06d}'.format(i % 60, i),
+                'user': '/api/v1/user/{0}/'.format(i % 10 + 1),
+                'tags': [],
+                'resource_uri': '/api/v1/entry/{0}/'.format(i),
+            }
+            for i in range(1, n + 1)
+        ]
+
+    def time_construct(self, n):
+        for row in self.rows:
+            self.factory.entry(_fields=row)
+
+    def time_construct_and_read_fields(self, n):
+        for row in self.rows:
+            entry = self.factory.entry(_fields=row)
+            entry.title
+            entry.created
+
+
+class QuerySetIteration(object):
+    params = [10000, 100000]
+    param_names = ['resources']
+
+    def setup(self, n):
+        self.factory = replay_factory(canned_api(n))
+        # Warm up the schemas, and the adapter's encoded pages.
+        list(self.factory.entry.all())
+
+    def time_iterate(self, n):
+        list(self.factory.entry.all())
+
+    def time_slice(self, n):
+        query = self.factory.entry.all()
+        for start in range(0, n, 1000):
+            query[start:start + 20]
+
+    def time_count(self, n):
+        for _ in range(100):
+            self.factory.entry.all().count()
+
+
+class Compression(object):
+    params = [100, 1000, 10000]
+    param_names = ['resources']
+
+    def setup(self, n):
+        self.plain = TastyApi(REPLAY_ADDRESS)
+        self.compressed = TastyApi(REPLAY_ADDRESS, compress_requests=0)
+        self.body = json.dumps({'objects': ResourceConstruction._rows(n), 'deleted_objects': []})
+        self.gzipped = self.compressed._encode(self.body)[0]
+
+    def time_encode(self, n):
+        self.plain._encode(self.body)
+
+    def time_encode_gzipped(self, n):
+        self.compressed._encode(self.body)
+
+    def time_decompress(self, n):
+        zlib.decompress(self.gzipped, 16 + zlib.MAX_WBITS)
+
+    def track_bytes(self, n):
+        return len(self.body.encode('utf-8'))
+
+    def track_bytes_gzipped(self, n):
+        return len(self.gzipped)
+
+
+def _benchmarks(match):
+    module = sys.modules[__name__]
+    for class_name, cls in inspect.getmembers(module, inspect.isclass):
+        if cls.__module__ != __name__ or not hasattr(cls, 'params'):
+            continue
+        for method_name, _ in inspect.getmembers(cls, inspect.isroutine):
+            name = '{0}.{1}'.format(class_name, method_name)
+            if method_name.startswith(('time_', 'track_')) and (not match or match in name):
+                yield name, cls, method_name
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the client without a server.')
+    parser.add_argument('--match', help='Only run benchmarks whose name contains this.')
+    parser.add_argument('--sizes', type=int, nargs='+', help="Override each benchmark's params.")
+    parser.add_argument('--repeat', type=int, default=3, help='The number of timings of each benchmark.')
+    parser.add_argument('--profile', action='store_true', help='Print a profile of each benchmark instead.')
+    parser.add_argument('--output', help='The file to write the JSON results to.')
+    options = parser.parse_args(argv)
+
+    results = []
+    for name, cls, method_name in _benchmarks(options.match):
+        for param in options.sizes or cls.params:
+            benchmark = cls()
+            benchmark.setup(param)
+            method = getattr(benchmark, method_name)
+            if method_name.startswith('track_'):
+                value = method(param)
+                results.append({'benchmark': name, 'param': param, 'value': value})
+                print('{0:>50} {1:>8}: {2}'.format(name, param, value))
+                continue
+            if options.profile:
+                profile = cProfile.Profile()
+                profile.runcall(method, param)
+                print('\n{0}({1})'.format(name, param))
+                pstats.Stats(profile).sort_stats('cumulative').print_stats(25)
+                continue
+            times = []
+            for _ in range(options.repeat):
+                start = time.time()
+                method(param)
+                times.append(time.time() - start)
+            times.sort()
+            results.append({'benchmark': name, 'param': param, 'min': times[0], 'median': times[len(times) // 2]})
+            print('{0:>50} {1:>8}: {2:.4f}s ({3:.2f}us each)'.format(name, param, times[0], times[0] * 1e6 / param))
+
+    if options.output:
+        with open(options.output, 'w') as output:
+            json.dump(results, output, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
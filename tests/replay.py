@@ -0,0 +1,224 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# pylint: skip-file
+
+"""Answer requests from responses held in memory, instead of a server.
+
+Responses can be recorded from the test site with a RecordingAdapter, and
+replayed later with a ReplayAdapter::
+
+    recorder = RecordingAdapter()
+    factory = ResourceFactory('http://localhost:8111/test/api/v1/', adapters={'http://': recorder})
+    list(factory.tree.all())
+    recorder.save('tree.json')
+
+    replay = ReplayAdapter.load('tree.json')
+    factory = ResourceFactory('http://localhost:8111/test/api/v1/', adapters={'http://': replay})
+
+Or the responses can be made up, using canned_api() to build a whole API.
+"""
+
+
+import json
+try:
+    from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
+except ImportError:     # For python < 3
+    from urlparse import urlparse, urlunparse, parse_qsl
+    from urllib import urlencode
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from tastytopping import ResourceFactory
+
+
+REPLAY_ADDRESS = 'http://replay/api/v1/'
+
+
+def normalise_url(url):
+    """Return the URL with its query string in a consistent order."""
+    parts = urlparse(url)
+    query = urlencode(sorted(parse_qsl(parts.query)))
+    return urlunparse((parts.scheme, parts.netloc, parts.path, parts.params, query, ''))
+
+
+def _response(request, status, content):
+    response = requests.Response()
+    response.status_code = status
+    response._content = content
+    response.headers = CaseInsensitiveDict({'Content-Type': 'application/json'})
+    response.encoding = 'utf-8'
+    response.url = request.url
+    response.request = request
+    return response
+
+
+class ReplayAdapter(BaseAdapter):
+    """Responds to each request with the canned response for its method and
+    URL, or a 404.
+
+    Lists of resources are served a page at a time, respecting the limit and
+    offset requested. Each page is only encoded once, so that replaying
+    measures the client, rather than the adapter.
+    """
+
+    def __init__(self, responses=None):
+        super(ReplayAdapter, self).__init__()
+        self.responses = {}
+        self.requests = 0
+        self._lists = {}
+        self._pages = {}
+        for (method, url), (status, body) in (responses or {}).items():
+            self.add(method, url, body, status)
+
+    @classmethod
+    def load(cls, filename):
+        with open(filename) as recording:
+            return cls({
+                (method, url): (status, body)
+                for method, url, status, body in json.load(recording)
+            })
+
+    def add(self, method, url, body, status=200):
+        content = b'' if body is None else json.dumps(body).encode('utf-8')
+        self.responses[(method, normalise_url(url))] = (status, content)
+
+    def add_list(self, url, objects, limit=1000, max_limit=1000):
+        self._lists[urlparse(url).path] = (objects, limit, max_limit)
+
+    def _page(self, url):
+        parts = urlparse(url)
+        objects, default_limit, max_limit = self._lists[parts.path]
+        params = dict(parse_qsl(parts.query))
+        # Like tastypie, a limit of 0 means as many as allowed.
+        limit = int(params.get('limit', default_limit)) or max_limit or len(objects)
+        if max_limit:
+            limit = min(limit, max_limit)
+        offset = int(params.get('offset', 0))
+        key = (parts.path, limit, offset)
+        if key not in self._pages:
+            next_url = None
+            if offset + limit < len(objects):
+                next_url = '{0}?limit={1}&offset={2}'.format(parts.path, limit, offset + limit)
+            page = {
+                'meta': {'limit': limit, 'offset': offset, 'total_count': len(objects), 'next': next_url},
+                'objects': objects[offset:offset + limit],
+            }
+            self._pages[key] = json.dumps(page).encode('utf-8')
+        return self._pages[key]
+
+    def send(self, request, **kwargs):
+        self.requests += 1
+        url = normalise_url(request.url)
+        if (request.method, url) in self.responses:
+            status, content = self.responses[(request.method, url)]
+            return _response(request, status, content)
+        if request.method == 'GET' and urlparse(url).path in self._lists:
+            return _response(request, 200, self._page(url))
+        return _response(request, 404, b'')
+
+    def close(self):
+        pass
+
+
+class RecordingAdapter(HTTPAdapter):
+    """Sends requests as usual, keeping each response to replay later."""
+
+    def __init__(self, *args, **kwargs):
+        super(RecordingAdapter, self).__init__(*args, **kwargs)
+        self.recording = []
+
+    def send(self, request, *args, **kwargs):
+        response = super(RecordingAdapter, self).send(request, *args, **kwargs)
+        body = json.loads(response.content.decode('utf-8')) if response.content else None
+        self.recording.append((request.method, normalise_url(request.url), response.status_code, body))
+        return response
+
+    def save(self, filename):
+        with open(filename, 'w') as recording:
+            json.dump(self.recording, recording, indent=1)
+
+
+def _field(field_type, nullable=False, readonly=False, unique=False):
+    return {
+        'type': field_type,
+        'nullable': nullable,
+        'readonly': readonly,
+        'unique': unique,
+        'blank': False,
+        'default': 'No default provided.',
+        'help_text': '',
+    }
+
+
+def canned_api(num_entries, address=REPLAY_ADDRESS):
+    """Return a ReplayAdapter serving an API with "user" and "entry" resources,
+    where each of the num_entries entries refers to one of 10 users.
+    """
+    path = urlparse(address).path
+    schemas = {
+        'user': {
+            'fields': {
+                'id': _field('integer', unique=True),
+                'username': _field('string', unique=True),
+                'resource_uri': _field('string', readonly=True),
+            },
+            'filtering': {'id': 1, 'username': 1},
+            'ordering': ['id'],
+        },
+        'entry': {
+            'fields': {
+                'id': _field('integer', unique=True),
+                'title': _field('string'),
+                'rating': _field('integer'),
+                'created': _field('datetime'),
+                'user': _field('related'),
+                'tags': _field('related', nullable=True),
+                'resource_uri': _field('string', readonly=True),
+            },
+            'filtering': {'id': 1, 'title': 1, 'rating': 1, 'user': 2},
+            'ordering': ['id', 'rating'],
+        },
+    }
+    for schema in schemas.values():
+        schema.update({
+            'allowed_list_http_methods': ['get', 'post', 'patch', 'delete'],
+            'allowed_detail_http_methods': ['get', 'put', 'patch', 'delete'],
+            'default_format': 'application/json',
+            'default_limit': 1000,
+        })
+    users = [
+        {'id': i, 'username': 'user{0}'.format(i), 'resource_uri': '{0}user/{1}/'.format(path, i)}
+        for i in range(1, 11)
+    ]
+    entries = [
+        {
+            'id': i,
+            'title': 'Entry number {0}'.format(i),
+            'rating': i % 100,
+            'created': '2014-05-{0:02d}T12:{1:02d}:{2:02d}.{3:06d}'.format(i % 28 + 1, i % 60, i % 60, i % 1000000),
+            'user': users[i % 10]['resource_uri'],
+            'tags': [],
+            'resource_uri': '{0}entry/{1}/'.format(path, i),
+        }
+        for i in range(1, num_entries + 1)
+    ]
+
+    adapter = ReplayAdapter()
+    adapter.add('GET', address, {
+        name: {'list_endpoint': '{0}{1}/'.format(path, name), 'schema': '{0}{1}/schema/'.format(path, name)}
+        for name in schemas
+    })
+    for name, schema in schemas.items():
+        adapter.add('GET', '{0}{1}/schema/'.format(address, name), schema)
+    adapter.add_list(address + 'user/', users)
+    adapter.add_list(address + 'entry/', entries)
+    for user in users:
+        adapter.add('GET', '{0}user/{1}/'.format(address, user['id']), user)
+    return adapter
+
+
+def replay_factory(adapter, address=REPLAY_ADDRESS, **kwargs):
+    """Return a ResourceFactory whose requests are all answered by adapter."""
+    return ResourceFactory(address, adapters={address: adapter}, **kwargs)
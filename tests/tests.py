@@ -5,12 +5,24 @@
 
 import copy
 from datetime import datetime
+import functools
 import pickle
+import shutil
+import tempfile
+import threading
+import time
 import unittest
+import warnings
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
 
 from tastytopping import *
 
 from .tests_base import *
+from .replay import canned_api, replay_factory
 
 # Import the other tests to run.
 from .tests_auth import AuthTests
@@ -127,9 +139,10 @@ class IntegrationTests(TestsBase):
         resource1 = TestResource(path=self.TEST_PATH1, text=test_text).save()
         self.assertEqual(test_text, resource1.text)
 
-    def test_creating_resource_that_has_no_filters___object_created_but_exception_raised(self):
-        self.assertRaises(CreatedResourceNotFound, NoFilterResource(path='a').save)
-        self.assertEqual(next(iter(NoFilterResource.all())).path, 'a')
+    def test_creating_resource_that_has_no_filters___object_created_from_location(self):
+        res = NoFilterResource(path='a').save()
+        self.assertEqual(next(iter(NoFilterResource.all())), res)
+        self.assertEqual(res.path, 'a')
 
     def test_more_resources_to_get_than_default_limit___api_gets_all_resources(self):
         NUM_RESOURCES = 22
@@ -300,7 +313,7 @@ class IntegrationTests(TestsBase):
     def test_resource_deleted_on_another_machine___exception_raised_when_updating(self):
         res = TestResource(path=self.TEST_PATH1).save()
         self._delete(res)
-        res.rating = 50
+        res.rating = self.TEST_RATING1
         self.assertRaises(ResourceDeleted, res.save)
 
     def test_bulk_creation___multiple_resources_can_be_gotten(self):
@@ -439,13 +452,15 @@ class IntegrationTests(TestsBase):
         res1 = FACTORY.test_resource(_fields='/something/that/wont/merge/')
         self.assertRaises(BadUri, getattr, res1, 'rating')
 
-    def test_creating_two_identical_resources___second_is_unable_to_get_created_resource(self):
+    def test_creating_two_identical_resources___both_created_from_location(self):
         res1 = FACTORY.no_unique(name='name', num=0).save()
-        res2 = FACTORY.no_unique(name='name', num=0)
-        self.assertRaises(MultipleResourcesReturned, res2.save)
+        res2 = FACTORY.no_unique(name='name', num=0).save()
+        self.assertNotEqual(res1, res2)
 
-    def test_creating_resource_disallowing_gets___created_resource_not_found_raised(self):
-        self.assertRaises(CreatedResourceNotFound, FACTORY.only_post(path=self.TEST_PATH1).save)
+    def test_creating_resource_disallowing_gets___resource_created_without_get(self):
+        res = FACTORY.only_post(path=self.TEST_PATH1).save()
+        res.uri()
+        self.assertRaises(RestMethodNotAllowed, getattr, res, 'path')
 
     def test_date_only_model_field___correctly_handle_date_only(self):
         DATE = datetime(2014, 11, 12, 13, 14, 15)
@@ -490,9 +505,438 @@ class IntegrationTests(TestsBase):
 
         self.assertEqual(factory.test_resource.get(path=self.TEST_PATH1).created_by, user)
 
+    def test_compiled_fields___fields_accessed_via_descriptors(self):
+        factory = ResourceFactory('http://localhost:8111/test/api/v1/', compile_fields=True)
+        factory.test_resource.auth = HTTPApiKeyAuth(self.TEST_USERNAME, self.TEST_API_KEY)
+        res1 = factory.test_resource(path=self.TEST_PATH1)
+        self.assertEqual(res1.rating, 50)
+        self.assertRaises(ReadOnlyField, setattr, res1, 'reviewed', True)
+        self.assertRaises(FieldNotNullable, setattr, res1, 'rating', None)
+        res1.rating = self.TEST_RATING1
+        res1.save()
+        self.assertTrue('rating' in type(res1).__dict__)
+        self.assertEqual(TestResource.get(path=self.TEST_PATH1).rating, self.TEST_RATING1)
+
+    def test_compiled_fields_after_pickling___resource_useable(self):
+        factory = ResourceFactory('http://localhost:8111/test/api/v1/', compile_fields=True)
+        parent = factory.tree(name='parent', children=[factory.tree(name='tree1').save()]).save()
+        parent2 = pickle.loads(pickle.dumps(parent))
+        parent2.name = 'new_parent'
+        parent2.save()
+        self.assertEqual(TestTreeResource.get(name='new_parent').children[0].name, 'tree1')
+
+    def test_compiled_fields_loaded_by_derived_class___descriptors_shared_with_base_class(self):
+        factory = ResourceFactory('http://localhost:8111/test/api/v1/', compile_fields=True)
+
+        class DerivedTree(factory.tree):
+            pass
+
+        DerivedTree._schema()
+        self.assertIs(factory.tree._schema(), DerivedTree._schema())
+        self.assertTrue('name' in factory.tree.__dict__)
+        self.assertEqual(set(factory.tree._field_descriptors), set(n for n in factory.tree.__dict__ if n in factory.tree._schema().field_names()))
+        tree = DerivedTree(name='tree1').save()
+        tree.name = 'tree2'
+        tree.save()
+        self.assertEqual(TestTreeResource.get(name='tree2'), tree)
+
+    def test_adaptive_page_size___all_resources_iterated_within_server_limit(self):
+        page_size = AdaptivePageSize(initial=3, minimum=2, target_time=60)
+        factory = ResourceFactory('http://localhost:8111/test/api/v1/', page_size=page_size)
+        for i in range(25):
+            factory.tree(name='tree{0}'.format(i)).save()
+        self.assertEqual(25, len(list(factory.tree.all())))
+        self.assertEqual(10, page_size.limit(factory.tree._full_name()))
+
+    def test_concurrent_identical_gets___single_request_sent(self):
+        TestResource(path=self.TEST_PATH1, rating=self.TEST_RATING1).save()
+        test_resource = ResourceFactory('http://localhost:8111/test/api/v1/').test_resource
+        test_resource.auth = HTTPApiKeyAuth(self.TEST_USERNAME, self.TEST_API_KEY)
+        test_resource._schema()
+        transfers = count_transfers(test_resource, delay=0.5)
+        resources = []
+        threads = [
+            threading.Thread(target=lambda: resources.append(test_resource.get(path=self.TEST_PATH1)))
+            for _ in range(20)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(1, transfers.requests)
+        self.assertEqual(20, len(set(id(r) for r in resources)))
+        self.assertTrue(all(r.rating == self.TEST_RATING1 for r in resources))
+
+    def test_cached_responses___repeated_gets_not_sent(self):
+        factory = ResourceFactory('http://localhost:8111/test/api/v1/', cache=MemoryCache(timeouts={'tree': 60}))
+        factory.tree(name='tree1').save()
+        transfers = count_transfers(factory.tree)
+        factory.tree.get(name='tree1')
+        factory.tree.get(name='tree1')
+        self.assertEqual(1, transfers.requests)
+
+    def test_cached_responses_with_different_auth___not_shared(self):
+        cache = MemoryCache(timeouts={'test_resource': 60})
+        factory1 = ResourceFactory('http://localhost:8111/test/api/v1/', cache=cache)
+        factory2 = ResourceFactory('http://localhost:8111/test/api/v1/', cache=cache)
+        factory1.test_resource.auth = HTTPApiKeyAuth(self.TEST_USERNAME, self.TEST_API_KEY)
+        factory2.test_resource.auth = HTTPApiKeyAuth(self.TEST_USERNAME, 'not the api key')
+        TestResource(path=self.TEST_PATH1).save()
+        self.assertEqual(self.TEST_PATH1, factory1.test_resource.get(path=self.TEST_PATH1).path)
+        self.assertRaises(ErrorResponse, factory2.test_resource.get, path=self.TEST_PATH1)
+
+    def test_updating_cached_resource___cached_responses_invalidated(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, True)
+        factory = ResourceFactory('http://localhost:8111/test/api/v1/', cache=DiskCache(directory, timeouts={'tree': 60}))
+        factory.tree(name='tree1').save()
+        factory.tree.get(name='tree1').update(name='tree2')
+        self.assertRaises(NoResourcesExist, factory.tree.get, name='tree1')
+        self.assertEqual('tree2', factory.tree.get(name='tree2').name)
+
+    def test_retrying_unavailable_api___get_succeeds(self):
+        factory = ResourceFactory('http://localhost:8111/test/api/v1/', retry=RetryPolicy(backoff=0.01))
+        factory.tree(name='tree1').save()
+        failures = fail_requests(factory.tree, 2, headers={'Retry-After': '0'})
+        self.assertEqual('tree1', factory.tree.get(name='tree1').name)
+        self.assertEqual(3, failures.requests)
+
+    def test_retrying_unavailable_api___post_not_retried(self):
+        factory = ResourceFactory('http://localhost:8111/test/api/v1/', retry=RetryPolicy(backoff=0.01))
+        factory.tree._schema()
+        failures = fail_requests(factory.tree, 1)
+        self.assertRaises(ErrorResponse, factory.tree(name='tree1').save)
+        self.assertEqual(1, failures.requests)
+
+    def test_retry_budget_spent___request_no_longer_retried(self):
+        retry = RetryPolicy(backoff=0.01, budget_size=2)
+        factory = ResourceFactory('http://localhost:8111/test/api/v1/', retry=retry)
+        factory.tree._schema()
+        failures = fail_requests(factory.tree, 10)
+        self.assertRaises(ErrorResponse, factory.tree.get, name='tree1')
+        self.assertEqual(3, failures.requests)
+        self.assertLess(retry.budget, 1)
+
+    def test_throttled_rate___requests_spread_out(self):
+        factory = ResourceFactory('http://localhost:8111/test/api/v1/', throttle=Throttle(rate=10, burst=1))
+        factory.tree._schema()
+        start = datetime.now()
+        for _ in range(6):
+            factory.tree.all().count()
+        self.assertGreaterEqual((datetime.now() - start).total_seconds(), 0.5)
+
+    def test_throttled_concurrency___in_flight_requests_capped(self):
+        factory = ResourceFactory('http://localhost:8111/test/api/v1/', throttle=Throttle(max_concurrency=2))
+        factory.tree._schema()
+        transfers = count_transfers(factory.tree, delay=0.1)
+        gather(*[factory.tree.filter(name=str(i)).count for i in range(8)])
+        self.assertEqual(8, transfers.requests)
+        self.assertEqual(2, transfers.max_in_flight)
+
+    def test_failing_endpoint___circuit_opens_then_recovers(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.5)
+        factory = ResourceFactory('http://localhost:8111/test/api/v1/', breaker=breaker)
+        factory.tree(name='tree1').save()
+        endpoint = factory.tree._full_name()
+        failures = fail_requests(factory.tree, 2, status=500)
+        self.assertRaises(ErrorResponse, factory.tree.get, name='tree1')
+        self.assertRaises(ErrorResponse, factory.tree.get, name='tree1')
+        self.assertEqual(CircuitBreaker.OPEN, breaker.state(endpoint))
+        self.assertRaises(CircuitOpen, factory.tree.get, name='tree1')
+        self.assertEqual(2, failures.requests)
+        time.sleep(0.5)
+        self.assertEqual(CircuitBreaker.HALF_OPEN, breaker.states()[endpoint])
+        self.assertEqual('tree1', factory.tree.get(name='tree1').name)
+        self.assertEqual(CircuitBreaker.CLOSED, breaker.state(endpoint))
+
+    def test_setting_resource_timeout___timeout_used_by_resource_only(self):
+        factory = ResourceFactory('http://localhost:8111/test/api/v1/', timeout=(1, 10))
+        self.assertEqual((1, 10), factory.tree.timeout)
+        factory.tree.timeout = 30
+        self.assertEqual(30, factory.tree._api().timeout)
+        self.assertEqual((1, 10), factory.test_resource._api().timeout)
+        self.assertEqual(30, type(pickle.loads(pickle.dumps(factory.tree(name='tree1').save()))).timeout)
+
+    def test_deadline_passed___remaining_requests_not_sent(self):
+        TestTreeResource.create([{'name': str(i)} for i in range(0, 25)])
+        tree = ResourceFactory('http://localhost:8111/test/api/v1/').tree
+        tree._schema()
+        transfers = count_transfers(tree, delay=0.3)
+        with self.assertRaises(DeadlineExceeded):
+            with deadline(0.5):
+                list(tree.all())
+        self.assertLess(transfers.requests, 3)
+
+    def test_deadline_passed_in_gathered_query___raised(self):
+        TestTreeResource.create([{'name': str(i)} for i in range(0, 25)])
+        tree = ResourceFactory('http://localhost:8111/test/api/v1/').tree
+        tree._schema()
+        transfers = count_transfers(tree, delay=0.3)
+        with self.assertRaises(DeadlineExceeded):
+            with deadline(0.5):
+                gather(tree.all())
+        self.assertLess(transfers.requests, 3)
+
+    def test_deadline_shorter_than_throttle_wait___raised_without_waiting(self):
+        factory = ResourceFactory('http://localhost:8111/test/api/v1/', throttle=Throttle(rate=0.5, burst=1))
+        factory.tree._schema()
+        transfers = count_transfers(factory.tree)
+        start = datetime.now()
+        with self.assertRaises(DeadlineExceeded):
+            with deadline(1):
+                factory.tree.all().count()
+        self.assertLess((datetime.now() - start).total_seconds(), 1)
+        self.assertEqual(0, transfers.requests)
+
+    def test_deadline_passed_waiting_for_identical_get___raised(self):
+        tree = ResourceFactory('http://localhost:8111/test/api/v1/').tree
+        tree._schema()
+        count_transfers(tree, delay=1)
+        leader = threading.Thread(target=tree.all().count)
+        leader.start()
+        self.addCleanup(leader.join)
+        time.sleep(0.2)
+        start = datetime.now()
+        with self.assertRaises(DeadlineExceeded):
+            with deadline(0.3):
+                tree.all().count()
+        self.assertLess((datetime.now() - start).total_seconds(), 0.7)
+
+    def test_hooks___requests_and_fields_reported(self):
+        request_events = []
+        fields_events = []
+        hooks = Hooks()
+        hooks.on_request(request_events.append)
+        hooks.on_fields(fields_events.append)
+        factory = ResourceFactory('http://localhost:8111/test/api/v1/', hooks=hooks)
+        tree = factory.tree(name='tree1').save()
+        tree.delete()
+        post = [e for e in request_events if e.method == 'POST'][0]
+        self.assertEqual(201, post.status)
+        self.assertGreater(post.bytes_sent, 0)
+        self.assertGreater(post.bytes_received, 0)
+        self.assertGreaterEqual(post.elapsed, post.ttfb)
+        self.assertEqual(factory.tree._full_name() + '{id}/', request_events[-1].url_template)
+        self.assertEqual(set(['tree']), set(e.resource_name for e in fields_events))
+        hooks.remove(request_events.append)
+        factory.tree.all().count()
+        self.assertEqual('DELETE', request_events[-1].method)
+
+    def test_lazily_loading_related_resources_in_loop___n_plus_one_warned(self):
+        factory = ResourceFactory('http://localhost:8111/test/api/v1/', n_plus_one=NPlusOneDetector())
+        root = factory.tree(name='root').save()
+        factory.tree.create([{'name': str(i), 'parent': root} for i in range(0, 3)])
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            parents = [child.parent.name for child in factory.tree.filter(parent=root)]
+        self.assertEqual(['root'] * 3, parents)
+        self.assertEqual([NPlusOneWarning], [w.category for w in caught])
+        self.assertEqual(__file__.replace('.pyc', '.py'), caught[0].filename)
+
+    def test_lazily_loading_related_resources_in_loop___n_plus_one_raised(self):
+        factory = ResourceFactory('http://localhost:8111/test/api/v1/', n_plus_one=NPlusOneDetector(action='raise'))
+        root = factory.tree(name='root').save()
+        factory.tree.create([{'name': str(i), 'parent': root} for i in range(0, 3)])
+        factory.tree.filter(parent=root)[0].parent.name
+        with self.assertRaises(NPlusOneQueries):
+            for child in factory.tree.filter(parent=root):
+                child.parent.name
+        for child in factory.tree.filter(parent=root).prefetch_related('parent'):
+            child.parent.name
+
+    def test_factory_with_adapters___requests_sent_through_adapters(self):
+        adapter = canned_api(30)
+        factory = replay_factory(adapter)
+        entries = list(factory.entry.all())
+        self.assertEqual(30, len(entries))
+        self.assertEqual('user2', entries[0].user.username)
+        self.assertEqual(5, adapter.requests)
+
+    def test_factory_with_transport___requests_sent_through_transport(self):
+        sent = []
+
+        class RecordingTransport(RequestsTransport):
+            def request(self, method, url, **kwargs):
+                sent.append((method, url))
+                return super(RecordingTransport, self).request(method, url, **kwargs)
+
+        factory = ResourceFactory('http://localhost:8111/test/api/v1/', transport=RecordingTransport)
+        factory.tree(name='tree1').save()
+        self.assertEqual(1, factory.tree.all().count())
+        self.assertIn(('POST', factory.tree._full_name()), sent)
+        self.assertIsInstance(factory.tree._api()._transport(), RecordingTransport)
+
+    def test_wsgi_transport___requests_handled_in_process(self):
+        transport = functools.partial(WsgiTransport, testsite_application())
+        factory = ResourceFactory('http://localhost:8111/test/api/v1/', transport=transport)
+        factory.tree(name=u'tést1').save()
+        self.assertEqual(u'tést1', TestTreeResource.get(name=u'tést1').name)
+        TestTreeResource(name='tree2').save()
+        self.assertEqual(set([u'tést1', 'tree2']), set(t.name for t in factory.tree.all()))
+        factory.test_resource.auth = HTTPApiKeyAuth(self.TEST_USERNAME, self.TEST_API_KEY)
+        factory.test_resource(path=self.TEST_PATH1).save()
+        self.assertEqual(1, TestResource.filter(path=self.TEST_PATH1).count())
+
+    def test_wsgi_transport_with_session_auth___cookies_kept_between_requests(self):
+        factory = ResourceFactory(
+            'http://localhost:8111/test/api/v1/',
+            transport=functools.partial(WsgiTransport, testsite_application()),
+        )
+        factory.user.nested.login(username=self.TEST_USERNAME, password='password').post()
+        factory.user.auth = HTTPSessionAuth()
+        self.assertEqual(self.TEST_USERNAME, factory.user.get(username=self.TEST_USERNAME).username)
+
+    @unittest.skipIf(httpx is None, 'httpx is not installed')
+    def test_http2_transport___requests_sent_with_httpx(self):
+        factory = ResourceFactory('http://localhost:8111/test/api/v1/', transport=Http2Transport)
+        factory.tree(name=u'tést1').save()
+        self.assertEqual(u'tést1', TestTreeResource.get(name=u'tést1').name)
+        self.assertEqual([1, 1], gather(factory.tree.all().count, factory.tree.all().count))
+        factory.user.nested.login(username=self.TEST_USERNAME, password='password').post()
+        factory.user.auth = HTTPSessionAuth()
+        self.assertEqual(self.TEST_USERNAME, factory.user.get(username=self.TEST_USERNAME).username)
+
+    @unittest.skipIf(httpx is None, 'httpx is not installed')
+    def test_http2_transport_to_closed_port___exception_raised(self):
+        self.assertRaises(
+            CannotConnectToAddress,
+            ResourceFactory,
+            'http://localhost:8888/test/api/v1/',
+            transport=Http2Transport,
+        )
+
+    def test_compress_requests___gzipped_bodies_accepted_by_api(self):
+        sent = []
+
+        class RecordingTransport(RequestsTransport):
+            def request(self, method, url, **kwargs):
+                sent.append((method, kwargs['headers'].get('content-encoding')))
+                return super(RecordingTransport, self).request(method, url, **kwargs)
+
+        with compressing_testsite() as address:
+            factory = ResourceFactory(address, transport=RecordingTransport, compress_requests=100)
+            factory.tree(name='tree1').save()
+            factory.tree.create([{'name': u'trée{0}'.format(i)} for i in range(20)])
+        self.assertEqual(21, TestTreeResource.filter(name__in=['tree1'] + [u'trée{0}'.format(i) for i in range(20)]).count())
+        self.assertEqual(u'trée3', TestTreeResource.get(name=u'trée3').name)
+        self.assertIn(('POST', None), sent)
+        self.assertIn(('PATCH', 'gzip'), sent)
+
+    def test_compressed_responses___decompressed(self):
+        encodings = []
+
+        class RecordingTransport(RequestsTransport):
+            def request(self, method, url, **kwargs):
+                response = super(RecordingTransport, self).request(method, url, **kwargs)
+                encodings.append(response.headers.get('content-encoding'))
+                return response
+
+        TestTreeResource.create([{'name': 'gzip{0}'.format(i)} for i in range(20)])
+        with compressing_testsite() as address:
+            factory = ResourceFactory(address, transport=RecordingTransport)
+            trees = list(factory.tree.filter(name__startswith='gzip'))
+        self.assertEqual(set('gzip{0}'.format(i) for i in range(20)), set(t.name for t in trees))
+        self.assertIn('gzip', encodings)
+
+    def test_concurrent_identical_gets_failing___each_thread_raises_own_error(self):
+        test_resource = ResourceFactory('http://localhost:8111/test/api/v1/').test_resource
+        test_resource.auth = HTTPApiKeyAuth(self.TEST_USERNAME, self.TEST_API_KEY)
+        test_resource._schema()
+        transfers = fail_requests(test_resource, failures=5, status=400)
+        transfers.delay = 0.5
+        errors = []
+
+        def _get():
+            try:
+                test_resource.get(path=self.TEST_PATH1)
+            except ErrorResponse as err:
+                errors.append(err)
+
+        threads = [threading.Thread(target=_get) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(1, transfers.requests)
+        self.assertEqual(5, len(set(id(e) for e in errors)))
+
+    def test_concurrent_identical_gets_with_different_auth___not_shared(self):
+        TestResource(path=self.TEST_PATH1).save()
+        test_resource = ResourceFactory('http://localhost:8111/test/api/v1/').test_resource
+        test_resource._schema()
+        transfers = count_transfers(test_resource, delay=0.5)
+        api = test_resource._api()
+        api.auth = HTTPApiKeyAuth(self.TEST_USERNAME, self.TEST_API_KEY)
+        first = threading.Thread(target=api.get, args=(test_resource._full_name(), ))
+        first.start()
+        time.sleep(0.1)
+        api.auth = HTTPApiKeyAuth(self.TEST_USERNAME, self.TEST_API_KEY)
+        api.get(test_resource._full_name())
+        first.join()
+        self.assertEqual(2, transfers.requests)
+
+    def test_setting_field_to_unchanged_value___save_sends_no_request(self):
+        TestResource(path=self.TEST_PATH1, rating=self.TEST_RATING1).save()
+        res1 = TestResource.get(path=self.TEST_PATH1)
+        self._delete(res1)
+        transfers = count_transfers(TestResource)
+        res1.rating = self.TEST_RATING1
+        res1.save()
+        self.assertEqual(0, transfers.requests)
+
+    def test_saving_stale_resource___only_changed_fields_sent(self):
+        res1 = TestResource(path=self.TEST_PATH1, rating=self.TEST_RATING1).save()
+        res2 = TestResource.get(path=self.TEST_PATH1)
+        res2.rating = self.TEST_RATING1 + 1
+        res2.save()
+        res1.title = 'TITLE'
+        res1.save()
+        res3 = TestResource.get(path=self.TEST_PATH1)
+        self.assertEqual(res3.rating, self.TEST_RATING1 + 1)
+        self.assertEqual(res3.title, 'TITLE')
+
+    def test_saving_with_put_only___full_resource_updated(self):
+        tree1 = TestTreeResource(name='tree1').save()
+        tree2 = TestTreeResource.get(name='tree1')
+        tree2.name = 'tree2'
+        tree2.save()
+        self.assertEqual(TestTreeResource.get(name='tree2'), tree1)
+
+    def test_saving_in_batch___changes_only_sent_after_batch(self):
+        res1 = TestResource(path=self.TEST_PATH1, rating=self.TEST_RATING1).save()
+        res2 = TestResource(path=self.TEST_PATH2, rating=self.TEST_RATING1).save()
+        with FACTORY.batch():
+            res1.rating = self.TEST_RATING1 + 1
+            res1.save()
+            res2.delete()
+            self.assertEqual(TestResource.get(path=self.TEST_PATH1).rating, self.TEST_RATING1)
+            self.assertEqual(2, len(TestResource))
+        self.assertEqual(TestResource.get(path=self.TEST_PATH1).rating, self.TEST_RATING1 + 1)
+        self.assertEqual(1, len(TestResource))
+        self.assertRaises(ResourceDeleted, res2.save)
+
+    def test_exception_in_batch___changes_discarded(self):
+        res1 = TestResource(path=self.TEST_PATH1, rating=self.TEST_RATING1).save()
+        with self.assertRaises(ValueError):
+            with FACTORY.batch():
+                res1.update(rating=self.TEST_RATING1 + 1)
+                raise ValueError()
+        self.assertEqual(TestResource.get(path=self.TEST_PATH1).rating, self.TEST_RATING1)
+
+    def test_saving_after_exception_in_batch___discarded_changes_not_sent(self):
+        res1 = TestResource(path=self.TEST_PATH1, rating=self.TEST_RATING1).save()
+        with self.assertRaises(ValueError):
+            with FACTORY.batch():
+                res1.update(rating=self.TEST_RATING1 + 1)
+                raise ValueError()
+        self.assertEqual(self.TEST_RATING1, res1.rating)
+        res1.path = self.TEST_PATH2
+        res1.save()
+        res2 = TestResource.get(path=self.TEST_PATH2)
+        self.assertEqual(self.TEST_RATING1, res2.rating)
+
     # FEATURES:
     # TODO Don't raise ResourceDeleted when unable to connect to API.
-    # TODO Don't update field if value the same.
     # TODO Only GET a new Resource when fields needed?!?! Should the exceptions be delayed?!? Will it be confusing?!?
     # TODO Allow files to be passed when tastypie supports it (https://github.com/cboelsen/tastytopping/issues/1)
     # TODO Allow 'exclude()' when tastypie allows it.
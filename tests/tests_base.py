@@ -3,7 +3,17 @@
 # pylint: skip-file
 
 
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
 import unittest
+from wsgiref.simple_server import make_server, WSGIRequestHandler
+
+import requests
+from requests.adapters import HTTPAdapter
 
 from tastytopping import *
 
@@ -28,6 +38,114 @@ class TestResourceDerived(TestResource):
     pass
 
 
+class CountingAdapter(HTTPAdapter):
+    """Counts the requests, response bytes, and objects transferred."""
+
+    def __init__(self, delay=0, *args, **kwargs):
+        super(CountingAdapter, self).__init__(*args, **kwargs)
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.bytes = 0
+        self.objects = 0
+
+    def send(self, request, *args, **kwargs):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.in_flight, self.max_in_flight)
+        try:
+            time.sleep(self.delay)
+            response = super(CountingAdapter, self).send(request, *args, **kwargs)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+        self.requests += 1
+        self.bytes += len(response.content)
+        if response.content:
+            self.objects += len(json.loads(response.content.decode('utf-8')).get('objects', []))
+        return response
+
+
+def count_transfers(resource_class, delay=0):
+    """Mount a new CountingAdapter on the resource_class's session."""
+    adapter = CountingAdapter(delay)
+    resource_class._api()._transport().mount('http://', adapter)
+    return adapter
+
+
+class FailingAdapter(CountingAdapter):
+    """Responds with the given status to the first failures requests."""
+
+    def __init__(self, failures, status=503, headers=None):
+        super(FailingAdapter, self).__init__()
+        self.failures = failures
+        self.status = status
+        self.headers = headers or {}
+
+    def send(self, request, *args, **kwargs):
+        if self.failures <= 0:
+            return super(FailingAdapter, self).send(request, *args, **kwargs)
+        time.sleep(self.delay)
+        self.failures -= 1
+        self.requests += 1
+        response = requests.Response()
+        response.status_code = self.status
+        response.headers.update(self.headers)
+        response._content = b''
+        response.url = request.url
+        response.request = request
+        return response
+
+
+def fail_requests(resource_class, failures, status=503, headers=None):
+    """Mount a new FailingAdapter on the resource_class's session."""
+    adapter = FailingAdapter(failures, status, headers)
+    resource_class._api()._transport().mount('http://', adapter)
+    return adapter
+
+
+def testsite_application():
+    """Return the test site's WSGI application, to call in this process."""
+    testsite_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'testsite')
+    if testsite_dir not in sys.path:
+        sys.path.insert(0, testsite_dir)
+    from testsite.wsgi import application
+    return application
+
+
+class _QuietRequestHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+@contextlib.contextmanager
+def compressing_testsite():
+    """Serve the test site from a thread in this process, with middleware
+    compressing its responses and decompressing gzipped requests, and yield
+    the address of its API.
+    """
+    testsite_application()
+    from django.conf import settings
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.test.utils import override_settings
+    middleware = (
+        'django.middleware.gzip.GZipMiddleware',
+        'testapp.middleware.GzipRequestMiddleware',
+    ) + tuple(settings.MIDDLEWARE_CLASSES)
+    with override_settings(MIDDLEWARE_CLASSES=middleware):
+        server = make_server('localhost', 0, WSGIHandler(), handler_class=_QuietRequestHandler)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        try:
+            yield 'http://localhost:{0}/test/api/v1/'.format(server.server_port)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
 # ############################### TEST CLASS ################################ #
 class TestsBase(unittest.TestCase):
 
@@ -53,7 +171,8 @@ class TestsBase(unittest.TestCase):
 
     def _delete_all(self, resource_class):
         try:
-            for resource in resource_class.all():
+            # Retrieve every page before deleting, as deleting shifts the offsets of later pages.
+            for resource in list(resource_class.all()):
                 try:
                     resource.delete()
                 except ResourceDeleted:
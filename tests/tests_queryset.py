@@ -427,6 +427,106 @@ class QuerySetTests(TestsBase):
         TestResource.all().delete()
         self.assertEqual(2, q1.count())
 
+    def test_caching_queryset_exists_on_iteration___exists_returns_value_at_evaluation_time(self):
+        TestResource.create([{'path': self.TEST_PATH1 + str(i), 'rating': i} for i in range(0, 2)])
+        q1 = TestResource.all()
+        next(iter(q1))
+        TestResource.all().delete()
+        self.assertTrue(q1.exists())
+        q2 = TestResource.all()
+        self.assertFalse(q2.exists())
+        TestResource.create([{'path': self.TEST_PATH1}])
+        self.assertFalse(q2)
+
+    def test_caching_queryset_slices___cached_values_returned_for_retrieved_range(self):
+        TestResource.create([{'path': self.TEST_PATH1 + str(i), 'rating': i} for i in range(0, 10)])
+        q1 = TestResource.filter(order_by='rating')
+        first = q1.first()
+        middle = q1[3:6]
+        TestResource.all().delete()
+        self.assertEqual(first, q1[0])
+        self.assertEqual(middle, q1[3:6])
+        self.assertEqual(middle[1:], q1[4:6])
+        self.assertEqual(middle[::-1], q1[5:2:-1])
+        self.assertEqual([], q1[6:8])
+
+    def test_caching_queryset_count___first_resource_cached(self):
+        TestResource.create([{'path': self.TEST_PATH1 + str(i), 'rating': i} for i in range(0, 3)])
+        q1 = TestResource.filter(order_by='-rating')
+        self.assertEqual(3, q1.count())
+        transfers = count_transfers(TestResource)
+        self.assertEqual(2, q1.first().rating)
+        self.assertEqual(0, transfers.requests)
+
+    def test_caching_queryset_slices_above_cache_size___least_recently_used_dropped(self):
+        TestResource.create([{'path': self.TEST_PATH1 + str(i), 'rating': i} for i in range(0, 10)])
+        q1 = TestResource.filter(order_by='rating')
+        q1.result_cache_size = 4
+        q1[0:3]
+        q1[6:9]
+        TestResource.filter(rating__lt=3).delete()
+        self.assertEqual(3, q1[0].rating)
+
+    def test_iterate_by_key___all_resources_returned_in_key_order(self):
+        TestResource.create([{'path': self.TEST_PATH1 + str(i), 'rating': i % 4} for i in range(0, 25)])
+        resources = list(TestResource.filter(rating__gt=0).iterate_by(chunk=4))
+        self.assertEqual(18, len(set(resources)))
+        self.assertEqual(sorted(r.id for r in resources), [r.id for r in resources])
+        resources = list(TestResource.all().iterate_by('-id', chunk=10))
+        self.assertEqual(sorted((r.id for r in resources), reverse=True), [r.id for r in resources])
+
+    def test_iterate_by_key_with_limit___only_limit_resources_returned(self):
+        TestResource.create([{'path': self.TEST_PATH1 + str(i)} for i in range(0, 10)])
+        self.assertEqual(7, len(list(TestResource.filter(limit=7).iterate_by('id', chunk=3))))
+
+    def test_iterate_by_key_with_chunk_above_max_limit___all_resources_returned(self):
+        TestTreeResource.create([{'name': str(i)} for i in range(0, 25)])
+        self.assertEqual(25, len(list(TestTreeResource.all().iterate_by(chunk=100))))
+
+    def test_iterate_by_key_without_gt_filter___exception_raised(self):
+        with self.assertRaises(FilterNotAllowedForField):
+            next(TestResource.all().iterate_by('path'))
+
+    def test_slicing_across_pages___only_sliced_resources_transferred(self):
+        TestTreeResource.create([{'name': str(i)} for i in range(0, 35)])
+        tree = ResourceFactory('http://localhost:8111/test/api/v1/').tree
+        tree._schema()
+        transfers = count_transfers(tree)
+        self.assertEqual(23, len(tree.all()[2:25]))
+        self.assertEqual(23, transfers.objects)
+        self.assertEqual(3, transfers.requests)
+        sliced_bytes = transfers.bytes
+        list(tree.all())
+        self.assertLess(sliced_bytes, transfers.bytes - sliced_bytes)
+
+    def test_iterating_with_limit___iteration_stops_at_limit(self):
+        TestTreeResource.create([{'name': str(i)} for i in range(0, 25)])
+        tree = ResourceFactory('http://localhost:8111/test/api/v1/').tree
+        transfers = count_transfers(tree)
+        self.assertEqual(13, len(list(tree.filter(limit=13))))
+        self.assertEqual(13, transfers.objects)
+
+    def test_gathering_queries___results_returned_in_order(self):
+        TestResource.create([{'path': self.TEST_PATH1 + str(i), 'rating': i} for i in range(0, 10)])
+        query = TestResource.filter(rating__lt=3)
+        count, resources, first_two, exists = gather(
+            TestResource.all().count,
+            query,
+            lambda: TestResource.all().order_by('rating')[0:2],
+            TestResource.filter(rating=100).exists,
+            max_workers=2,
+        )
+        self.assertEqual(10, count)
+        self.assertEqual(3, len(resources))
+        self.assertEqual(resources, query._retrieved_resources)
+        self.assertEqual([0, 1], [r.rating for r in first_two])
+        self.assertFalse(exists)
+
+    def test_gathering_failing_query___exception_raised(self):
+        TestResource(path=self.TEST_PATH1).save()
+        with self.assertRaises(NoResourcesExist):
+            gather(TestResource.all().count, lambda: TestResource.get(path=self.TEST_PATH2))
+
     def test_passing_queryset_as_filter___queryset_values_used_in_filter(self):
         TestTreeResource.create([{'name': str(i)} for i in range(-10, 0)])
         roots = list(TestTreeResource.all())
@@ -458,3 +558,35 @@ class QuerySetTests(TestsBase):
         self.assertEqual(1, len(query[-5:-2]))
         self.assertEqual(3, len(query[:5]))
         self.assertEqual(3, len(query[-5:]))
+
+    def test_queryset_with_stats___requests_for_results_and_related_resources_counted(self):
+        root = TestTreeResource(name='root').save()
+        TestTreeResource.create([{'name': str(i), 'parent': root} for i in range(0, 3)])
+        query = TestTreeResource.filter(parent=root).with_stats().order_by('name')
+        self.assertEqual(['root'] * 3, [child.parent.name for child in query])
+        tree_stats = query.stats['tree']
+        self.assertEqual(4, tree_stats.requests)
+        self.assertEqual(1, tree_stats.pages)
+        self.assertEqual(6, tree_stats.objects)
+        self.assertGreater(tree_stats.bytes_received, 0)
+        self.assertEqual(4, query.stats.requests)
+
+    def test_queryset_without_stats___stats_are_none(self):
+        self.assertIsNone(TestTreeResource.all().stats)
+
+    def test_profiling_factory___requests_inside_block_counted(self):
+        TestTreeResource.create([{'name': str(i)} for i in range(0, 3)])
+        with FACTORY.profile() as stats:
+            self.assertEqual(3, TestTreeResource.all().count())
+        TestTreeResource.all().count()
+        self.assertEqual(1, stats.requests)
+        self.assertEqual(1, stats['tree'].requests)
+        self.assertGreater(stats.wall_time, 0)
+
+    def test_profiling_factory_around_gather___workers_requests_counted(self):
+        TestTreeResource.create([{'name': str(i)} for i in range(0, 3)])
+        with FACTORY.profile() as stats:
+            counts = gather(TestTreeResource.all().count, TestTreeResource.filter(name='1').count)
+        self.assertEqual([3, 1], counts)
+        self.assertEqual(2, stats.requests)
+        self.assertEqual(2, stats['tree'].requests)
@@ -153,8 +153,9 @@ class TestResource(ModelResource):
             'date': ALL,
             'title': ALL,
             'created_by': ALL_WITH_RELATIONS,
+            'id': ALL,
         }
-        ordering = ['rating', 'date']
+        ordering = ['rating', 'date', 'id']
 
 
 class TestResource2(TestResource):
@@ -198,6 +199,7 @@ class TreeResource(ModelResource):
             'parent': ALL_WITH_RELATIONS,
             'children': ALL_WITH_RELATIONS,
         }
+        ordering = ['number', 'name']
 
     def prepend_urls(self):
         return [
@@ -1,6 +1,14 @@
 import traceback
+import zlib
 from django.http import HttpResponse
 
 class PlainTextExceptionMiddleware(object):
      def process_exception(self, request, exception):
          return HttpResponse(traceback.format_exc(), "text/plain")
+
+class GzipRequestMiddleware(object):
+     def process_request(self, request):
+         if request.META.get('HTTP_CONTENT_ENCODING') == 'gzip':
+             request._body = zlib.decompress(request.body, 16 + zlib.MAX_WBITS)
+             request.META['CONTENT_LENGTH'] = str(len(request._body))
+             del request.META['HTTP_CONTENT_ENCODING']